@@ -0,0 +1,229 @@
+import argparse
+import email.utils
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler,ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs,unquote,urlsplit
+
+import bootstrap
+from schema import SCHEMAS
+from search_index import SearchIndex
+from storage import SqliteStorage
+from wards import WardIndex
+
+
+# ---------------- READ-ONLY JSON API ----------------
+# Lookups for the phone app without a Streamlit rerun, served from the same
+# store as app.py (CSV or VILLAGE_DB):
+#
+#   GET /api/search?q=ravi[&table=pupils][&limit=50]
+#   GET /api/households/<Family_ID>     head row(s) and members
+#   GET /api/wards/<voter id>           ward of a voter id
+#   GET /api/places  /api/leagues       whole tables
+#   GET /api/version                    one tag for all the data
+#
+# Tables come back as {"columns":[...],"data":[[...],...]}. Every response
+# carries an ETag made from the versions of the tables it reads and a
+# Last-Modified from their files, so both are known before any work is
+# done: a request whose If-None-Match (or, without one, If-Modified-Since)
+# still matches gets an empty 304. Bodies are kept per ETag in a small LRU.
+# There is no login: bind to localhost (the default) or put it behind the
+# same proxy as the portal.
+
+SEARCHED=["families","pupils","places","team","leagues","youth"]
+LIMIT=50
+CACHED=256
+
+
+def frame(df):
+    return json.loads(df.to_json(orient="split",index=False))
+
+
+def dumps(payload):
+    return json.dumps(payload,separators=(",",":"),ensure_ascii=False).encode("utf-8")
+
+
+class NotFound(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+# ---------------- ROUTES ----------------
+# each: (tables read, build(store,arg,query) -> payload)
+def search(store,arg,query):
+    q=query.get("q",[""])[0].strip().lower()
+    if not q:
+        raise BadRequest("q is required")
+    try:
+        limit=max(1,int(query.get("limit",[LIMIT])[0]))
+    except ValueError:
+        raise BadRequest("limit must be a number")
+    out={}
+    for name in tables_searched(arg,query):
+        hits=store.derived(name,"search",SearchIndex).rows(q)
+        if len(hits):
+            out[name]={"total":len(hits),**frame(hits.head(limit))}
+    return {"query":q,"results":out}
+
+
+def tables_searched(arg,query):
+    names=query.get("table")
+    if not names:
+        return SEARCHED
+    unknown=[n for n in names if n not in SEARCHED]
+    if unknown:
+        raise BadRequest(f"unknown table: {', '.join(unknown)}")
+    return names
+
+
+def household(store,fid,query):
+    head=store.find("families","Family_ID",fid)
+    members=store.find("pupils","Family_ID",fid)
+    if head.empty and members.empty:
+        raise NotFound(f"no family {fid}")
+    return {"family_id":fid,"head":frame(head),"members":frame(members)}
+
+
+def ward(store,voter,query):
+    found=store.derived("ward_ranges","wards",WardIndex).resolve(voter)
+    return {"voter_id":voter,"ward":found if isinstance(found,str) else int(found)}
+
+
+def table(name):
+    return lambda store,arg,query:frame(store.read(name))
+
+
+def version(store,arg,query):
+    return {"version":tag(store,list(bootstrap.TABLES))}
+
+
+ROUTES={
+    "search":(SEARCHED,search),
+    "households":(["families","pupils"],household),
+    "wards":(["ward_ranges"],ward),
+    "places":(["places"],table("places")),
+    "leagues":(["leagues"],table("leagues")),
+    "version":(list(bootstrap.TABLES),version),
+}
+WITH_ARG={"households","wards"}
+
+
+# ---------------- VALIDATORS ----------------
+def tag(store,names,*parts):
+    seed=repr(([store.version(n) for n in names],parts))
+    return hashlib.sha1(seed.encode()).hexdigest()[:20]
+
+
+def modified(store,name):
+    if isinstance(store,SqliteStorage) and name in SCHEMAS:
+        paths=[Path(store.db_path),Path(store.db_path+"-wal")]
+    else:
+        j=(store.csv if isinstance(store,SqliteStorage) else store).journal(name)
+        paths=[j.csv_path,j.path]
+    times=[os.stat(p).st_mtime for p in paths if p.exists()]
+    return int(max(times)) if times else 0
+
+
+def not_modified(headers,etag,last):
+    match=headers.get("If-None-Match")
+    if match is not None:
+        return any(t.strip().removeprefix("W/") in ("*",etag) for t in match.split(","))
+    since=headers.get("If-Modified-Since")
+    if since:
+        try:
+            return last<=email.utils.parsedate_to_datetime(since).timestamp()
+        except (TypeError,ValueError):
+            return False
+    return False
+
+
+# ---------------- API ----------------
+class Api:
+
+    def __init__(self,store):
+        self.store=store
+        self.bodies=OrderedDict()
+        self._lock=threading.Lock()
+
+    def get(self,target,headers=None):
+        # -> (status, headers, body); the HTTP handler only writes these out
+        url=urlsplit(target)
+        parts=[unquote(p) for p in url.path.strip("/").split("/")]
+        if len(parts)<2 or parts[0]!="api" or parts[1] not in ROUTES:
+            return self.error(404,"unknown endpoint")
+        route,arg=parts[1],"/".join(parts[2:])
+        if (route in WITH_ARG)!=bool(arg):
+            return self.error(404,"unknown endpoint")
+        query=parse_qs(url.query)
+        names,build=ROUTES[route]
+
+        etag='"'+tag(self.store,names,route,arg,sorted(query.items()))+'"'
+        last=max(modified(self.store,n) for n in names)
+        head={"ETag":etag,"Last-Modified":email.utils.formatdate(last,usegmt=True),"Cache-Control":"no-cache"}
+        if headers and not_modified(headers,etag,last):
+            return 304,head,b""
+
+        with self._lock:
+            body=self.bodies.get(etag)
+            if body is not None:
+                self.bodies.move_to_end(etag)
+        if body is None:
+            try:
+                body=dumps(build(self.store,arg,query))
+            except BadRequest as e:
+                return self.error(400,str(e))
+            except NotFound as e:
+                return self.error(404,str(e))
+            with self._lock:
+                self.bodies[etag]=body
+                if len(self.bodies)>CACHED:
+                    self.bodies.popitem(last=False)
+        return 200,{**head,"Content-Type":"application/json; charset=utf-8"},body
+
+    def error(self,status,message):
+        return status,{"Content-Type":"application/json; charset=utf-8","Cache-Control":"no-store"},dumps({"error":message})
+
+
+class Handler(BaseHTTPRequestHandler):
+    api=None
+
+    def do_GET(self):
+        self.send(*self.api.get(self.path,self.headers))
+
+    def do_HEAD(self):
+        status,head,body=self.api.get(self.path,self.headers)
+        self.send(status,{**head,"Content-Length":str(len(body))},b"")
+
+    def send(self,status,head,body):
+        self.send_response(status)
+        for k,v in {"Content-Length":str(len(body)),**head}.items():
+            self.send_header(k,v)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(base_dir,host="127.0.0.1",port=8502):
+    handler=type("PortalHandler",(Handler,),{"api":Api(bootstrap.portal(base_dir).store)})
+    return ThreadingHTTPServer((host,port),handler)
+
+
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Read-only JSON API over the portal data.")
+    parser.add_argument("--dir",default=Path(__file__).parent,help="folder with the portal's CSV files")
+    parser.add_argument("--host",default="127.0.0.1")
+    parser.add_argument("--port",type=int,default=8502)
+    args=parser.parse_args()
+
+    server=serve(args.dir,args.host,args.port)
+    print(f"Serving {Path(args.dir).resolve()} on http://{args.host}:{args.port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,306 @@
+import argparse
+import io
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import api
+import bulk
+import data_cache
+import dedupe
+import geo
+import records
+import snapshots
+from schema import typed
+from search_index import FuzzyIndex,SearchIndex
+from storage import CsvStorage,SqliteStorage,migrate
+from synthetic import CENTER,WARD_SIZE,make_pupils,write_village
+from wards import WardIndex
+
+
+# ---------------- PORTAL BENCHMARKS ----------------
+# Builds a synthetic village (synthetic.py) at each size and times the code
+# the pages run: loading a table (from its .arrow snapshot and from the CSV),
+# preparing its search index, the Dashboard search (exact and
+# typo-tolerant), ward detection, nearest / radius / map-view queries over
+# the places, the household drill-down, the admin writes, duplicate
+# suggestions and bulk import/export, plus the memory held by the pupils
+# table (as read_csv guesses it and with schema.typed) and by its search
+# index.
+# Results are printed as JSON (or written with --out) so runs can be diffed
+# across commits.
+#
+#   python benchmark.py --sizes 1000 10000 --out before.json
+#   python benchmark.py --backend sqlite
+#   python benchmark.py --scan        # index vs the old str.contains scan
+#   python benchmark.py --imports     # cold import time of each page module
+
+SIZES=(1_000,10_000,100_000,1_000_000)
+QUERIES=("gudise manga","kumar","f00012","4532","xyz")
+FUZZY_QUERIES=("gudishe manga","koushick","venkatsh lanka","xyz")
+TYPED="gudise manga"
+LOOKUPS=1000
+WRITES=20
+
+
+def timed(fn,repeat=5):
+    runs=[]
+    for _ in range(repeat):
+        start=time.perf_counter()
+        fn()
+        runs.append((time.perf_counter()-start)*1000)
+    return {"ms":round(statistics.median(runs),3),"min_ms":round(min(runs),3),"runs":repeat}
+
+
+def per_call(result,calls):
+    return {**result,"calls":calls,"per_call_ms":round(result["ms"]/calls,4)}
+
+
+def mb(nbytes):
+    return round(nbytes/2**20,2)
+
+
+def frame_mb(df):
+    return mb(df.memory_usage(deep=True).sum())
+
+
+def commit():
+    try:
+        out=subprocess.run(["git","rev-parse","--short","HEAD"],capture_output=True,text=True,cwd=Path(__file__).parent)
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def open_store(base_dir,backend):
+    if backend=="sqlite":
+        db=Path(base_dir)/"village.db"
+        migrate(base_dir,db)
+        return SqliteStorage(db,base_dir)
+    return CsvStorage(base_dir)
+
+
+def cold(store,name):
+    data_cache.invalidate(store.path(name) if isinstance(store,CsvStorage) else store.key(name))
+
+
+# ---------------- ONE SIZE ----------------
+def bench_size(n,backend="csv",seed=0,repeat=5):
+    rng=np.random.default_rng(seed)
+    out={}
+    with tempfile.TemporaryDirectory() as tmp:
+        tables=write_village(tmp,n,seed)
+        store=open_store(tmp,backend)
+
+        def load():
+            cold(store,"pupils")
+            store.read("pupils")
+        out["load"]=timed(load,repeat)
+        if backend=="csv":
+            def load_csv():
+                snapshots.snapshot_path(store.path("pupils")).unlink(missing_ok=True)
+                load()
+            out["load_csv"]=timed(load_csv,repeat)   # cold start without the .arrow snapshot
+        out["load_cached"]=timed(lambda:store.read("pupils"),repeat)
+
+        pupils=store.read("pupils")
+        out["prepare"]=timed(lambda:SearchIndex(pupils),max(1,repeat//2))
+
+        index=store.derived("pupils","search",SearchIndex)
+        raw=pd.read_csv(Path(tmp)/"pupils.csv")
+        out["memory"]={
+            "pupils_raw_mb":frame_mb(raw),
+            "pupils_typed_mb":frame_mb(typed(raw)),
+            "search_index_mb":mb(index.nbytes()),
+        }
+        def search():
+            index.recent.clear()
+            for q in QUERIES:
+                index.rows(q)
+        out["search"]=per_call(timed(search,repeat),len(QUERIES))
+
+        # one keystroke at a time (row positions only), reusing the previous
+        # prefix's hits vs searching every prefix from scratch
+        prefixes=[TYPED[:i] for i in range(1,len(TYPED)+1)]
+        def typing():
+            index.recent.clear()
+            for q in prefixes:
+                index.search(q)
+        out["search_as_you_type"]=per_call(timed(typing,repeat),len(prefixes))
+        out["search_as_you_type_uncached"]=per_call(timed(lambda:[index._search(q) for q in prefixes],repeat),len(prefixes))
+
+        out["prepare_fuzzy"]=timed(lambda:FuzzyIndex(pupils,"Name"),max(1,repeat//2))
+        fuzzy=FuzzyIndex(pupils,"Name")
+        out["fuzzy_search"]=per_call(timed(lambda:[fuzzy.rows(q) for q in FUZZY_QUERIES],repeat),len(FUZZY_QUERIES))
+
+        wards=WardIndex(store.read("ward_ranges"))
+        voters=pupils["Voter_ID"].sample(min(LOOKUPS,len(pupils)),random_state=seed).tolist()
+        out["detect_ward"]=per_call(timed(lambda:[wards.resolve(v) for v in voters],repeat),len(voters))
+        out["ward_column"]=timed(lambda:wards.assign(pupils["Voter_ID"]),repeat)
+
+        # points of interest: nearest 5, everything within 500 m, one map view
+        points=geo.index(store,tmp)
+        lats=CENTER[0]+rng.normal(0,0.01,size=LOOKUPS)
+        lons=CENTER[1]+rng.normal(0,0.01,size=LOOKUPS)
+        around=list(zip(lats,lons))
+        out["geo_nearest"]=per_call(timed(lambda:[points.nearest(a,b,5) for a,b in around],repeat),LOOKUPS)
+        out["geo_within"]=per_call(timed(lambda:[points.within(a,b,500) for a,b in around],repeat),LOOKUPS)
+        out["geo_viewport"]=per_call(timed(lambda:[points.bbox(a-0.008,b-0.011,a+0.008,b+0.011,limit=300) for a,b in around],repeat),LOOKUPS)
+
+        fids=rng.choice(tables["families"]["Family_ID"],size=min(LOOKUPS,len(tables["families"])))
+        store.find("pupils","Family_ID",fids[0])   # build the index once
+        def drill_down():
+            for fid in fids:
+                store.find("families","Family_ID",fid)
+                store.find("pupils","Family_ID",fid)
+        out["family_drill_down"]=per_call(timed(drill_down,repeat),len(fids))
+
+        # admin record lookup by key, as the Edit / Delete tabs do it
+        keys=[str(v) for v in voters if pd.notna(v)]
+        records.key_index(store,"pupils")   # build the index once
+        out["admin_locate"]=per_call(timed(lambda:[records.locate(store,pupils,"pupils",v) for v in keys],repeat),len(keys))
+
+        # the JSON API: household lookups, then the same requests revalidated (304)
+        service=api.Api(store)
+        def api_household():
+            service.bodies.clear()
+            return [service.get(f"/api/households/{fid}") for fid in fids]
+        tags=[{"If-None-Match":head["ETag"]} for _,head,_ in api_household()]
+        out["api_household"]=per_call(timed(api_household,repeat),len(fids))
+        out["api_not_modified"]=per_call(timed(lambda:[service.get(f"/api/households/{fid}",t) for fid,t in zip(fids,tags)],repeat),len(fids))
+
+        # each admin write is followed by the reread of the next page run
+        row={c:str(v) for c,v in tables["pupils"].iloc[0].items()}
+        def write(op):
+            def run():
+                op()
+                store.read("pupils")
+            return per_call(timed(lambda:[run() for _ in range(WRITES)],1),WRITES)
+        out["admin_add"]=write(lambda:store.add("pupils",row))
+        out["admin_update"]=write(lambda:store.update("pupils",store.read("pupils").index[-1],{"Age":"30"}))
+        out["admin_delete"]=write(lambda:store.delete("pupils",store.read("pupils").index[-1]))
+
+        # duplicate suggestions: a full build, then the refresh after one add
+        out["dedupe_full"]=timed(lambda:dedupe.Deduper(store,Path(tmp)/"dedupe.json").suggestions("pupils"),1)
+        finder=dedupe.Deduper(store,Path(tmp)/"dedupe.json")
+        finder.suggestions("pupils")
+        def dedupe_add():
+            store.add("pupils",row)
+            finder.suggestions("pupils")
+        out["dedupe_incremental"]=timed(dedupe_add,max(1,repeat//2))
+
+        # one ward's voter list through the admin import: validate, then one add_many
+        upload=make_pupils(WARD_SIZE,seed+1).to_csv(index=False).encode()
+        def bulk_import():
+            result=bulk.validate("pupils",io.BytesIO(upload),store.read("pupils"))
+            store.add_many("pupils",result["rows"].to_dict("records"))
+            store.read("pupils")
+        out["bulk_import_ward"]=timed(bulk_import,1)
+        out["bulk_export"]=timed(lambda:bulk.export(store.read("pupils")),max(1,repeat//2))
+        data_cache.invalidate()
+    return out
+
+
+def run(sizes=SIZES,backend="csv",seed=0,repeat=5):
+    results=[]
+    for n in sizes:
+        start=time.perf_counter()
+        timings=bench_size(n,backend,seed,repeat)
+        memory=timings.pop("memory")
+        results.append({"rows":n,"timings":timings,"memory":memory,"wall_s":round(time.perf_counter()-start,2)})
+    return {
+        "commit":commit(),
+        "created":time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "backend":backend,
+        "seed":seed,
+        "python":platform.python_version(),
+        "pandas":pd.__version__,
+        "peak_rss_mb":mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024),
+        "results":results,
+    }
+
+
+# ---------------- SEARCH: INDEX VS SCAN ----------------
+def scan(df,fast,q):
+    return df[fast.apply(lambda x:x.str.contains(q,regex=False)).any(axis=1)]
+
+
+def per_query_ms(fn,queries):
+    start=time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter()-start)*1000/len(queries)
+
+
+def bench_search(sizes=(1_000,10_000,100_000),queries=QUERIES):
+    print(f"{'rows':>8} {'build s':>8} {'scan ms':>9} {'index ms':>9}")
+    for n in sizes:
+        df=make_pupils(n)
+        fast=df.astype(object).where(df.notna(),"").astype(str).apply(lambda x:x.str.lower())
+
+        start=time.perf_counter()
+        index=SearchIndex(df)
+        build=time.perf_counter()-start
+
+        for q in queries:
+            assert scan(df,fast,q).index.equals(index.rows(q).index),q
+
+        scan_ms=per_query_ms(lambda q:scan(df,fast,q),queries)
+        index.recent.clear()
+        index_ms=per_query_ms(lambda q:index.rows(q),queries)
+        print(f"{n:>8} {build:>8.2f} {scan_ms:>9.2f} {index_ms:>9.2f}")
+
+
+# ---------------- PAGE IMPORTS ----------------
+# What a page costs to import the first time it is shown, each module in a
+# fresh interpreter that already has streamlit and pandas (every rerun does).
+IMPORT_CODE="import time,pandas,streamlit;t=time.perf_counter();import {};print((time.perf_counter()-t)*1000)"
+
+
+def import_ms(module,repeat=3):
+    runs=[]
+    for _ in range(repeat):
+        out=subprocess.run([sys.executable,"-c",IMPORT_CODE.format(module)],
+                           capture_output=True,text=True,cwd=Path(__file__).parent,check=True)
+        runs.append(float(out.stdout.split()[-1]))
+    return min(runs)
+
+
+def bench_imports():
+    from views import PAGES
+    modules=["bootstrap","streamlit_option_menu"]+list(dict.fromkeys(f"views.{m}" for m,_ in PAGES.values()))
+    print(f"{'module':<24} {'import ms':>10}")
+    for module in modules:
+        print(f"{module:<24} {import_ms(module):>10.1f}")
+
+
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Time the portal's hot paths on a synthetic village.")
+    parser.add_argument("--sizes",type=int,nargs="+",default=list(SIZES))
+    parser.add_argument("--backend",choices=["csv","sqlite"],default="csv")
+    parser.add_argument("--seed",type=int,default=0)
+    parser.add_argument("--repeat",type=int,default=5)
+    parser.add_argument("--out",help="write the JSON report here instead of stdout")
+    parser.add_argument("--scan",action="store_true",help="compare the search index with a full scan")
+    parser.add_argument("--imports",action="store_true",help="time importing each page module")
+    args=parser.parse_args()
+
+    if args.imports:
+        bench_imports()
+    elif args.scan:
+        bench_search([n for n in args.sizes if n<=100_000])
+    else:
+        report=json.dumps(run(args.sizes,args.backend,args.seed,args.repeat),indent=2)
+        if args.out:
+            Path(args.out).write_text(report+"\n")
+        else:
+            print(report)
@@ -0,0 +1,135 @@
+import functools
+import os
+from pathlib import Path
+
+import streamlit as st
+
+import images
+import storage
+import village_stats
+from schema import SCHEMAS
+
+
+# ---------------- ONE-TIME BOOTSTRAP ----------------
+# Setup that only has to happen once per server process rather than on
+# every script rerun: creating missing tables, folding in journals a previous
+# run left behind, and opening the store and the statistics engine. portal() is cached, so a rerun gets the same Portal
+# back for the cost of a dict lookup. A table file deleted while the server
+# is running is recreated on the next start.
+
+TABLES={**SCHEMAS,"gallery":images.GALLERY,"dashboard_media":["Image","Caption"]}
+
+
+class Portal:
+
+    def __init__(self,base_dir):
+        self.base_dir=Path(base_dir)
+        self.store=storage.backend(self.base_dir)
+        for name,cols in TABLES.items():
+            self.store.ensure(name,cols)
+        self.stats=village_stats.engine(self.store,self.base_dir)
+
+
+@functools.lru_cache(maxsize=None)
+def _portal(base_dir,db):
+    return Portal(base_dir)
+
+
+def portal(base_dir):
+    return _portal(str(base_dir),os.environ.get("VILLAGE_DB"))
+
+
+# ---------------- PAGE HEAD ----------------
+# PWA links and the portal style in one markdown element. Streamlit drops
+# whatever a rerun does not send again, so this still goes out every rerun,
+# but as one prebuilt string.
+
+HEAD="""<link rel="manifest" href="/manifest.json">
+<script>
+if ('serviceWorker' in navigator) {
+  navigator.serviceWorker.register('/service-worker.js');
+}
+</script>
+<style>
+
+/* mobile container */
+.block-container{
+max-width:700px;
+margin:auto;
+padding-top:1rem;
+}
+
+/* background gradient */
+.stApp{
+background: linear-gradient(135deg,#0f2027,#203a43,#2c5364);
+}
+
+/* FIX TEXT VISIBILITY */
+h1,h2,h3,h4,p,span,label{
+color:#ffffff !important;
+}
+
+/* tables visibility */
+[data-testid="stDataFrame"]{
+background:white;
+color:black;
+}
+
+/* login card */
+.login-box{
+background:linear-gradient(135deg,#ffffff,#f0f0f0);
+padding:30px;
+border-radius:15px;
+color:black;
+box-shadow:0 10px 25px rgba(0,0,0,0.3);
+text-align:center;
+}
+
+/* horizontal scrolling welcome */
+.scroll-wrapper{
+max-width:700px;
+margin:auto;
+overflow:hidden;
+background:linear-gradient(90deg,#4facfe,#00f2fe);
+border-radius:12px;
+padding:10px;
+}
+
+.scroll-text{
+white-space:nowrap;
+display:inline-block;
+animation:scroll-left 15s linear infinite;
+font-size:22px;
+font-weight:bold;
+color:#fff;
+}
+
+@keyframes scroll-left{
+0%{transform:translateX(100%);}
+100%{transform:translateX(-100%);}
+}
+
+/* button */
+.stButton>button{
+background:linear-gradient(90deg,#ff7e5f,#feb47b);
+color:white;
+border-radius:10px;
+border:none;
+}
+
+/* sidebar */
+[data-testid="stSidebar"]{
+background:linear-gradient(#1f4037,#99f2c8);
+}
+
+/* input text */
+input, textarea{
+color:black !important;
+}
+
+</style>
+"""
+
+
+def head():
+    st.markdown(HEAD,unsafe_allow_html=True)
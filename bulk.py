@@ -0,0 +1,186 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from schema import SCHEMAS
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl=None
+
+
+# ---------------- BULK IMPORT / EXPORT ----------------
+# An uploaded CSV (or Excel sheet, when openpyxl is installed) is read
+# CHUNK rows at a time and every chunk is checked against the table's
+# schema: required key columns filled, numbers where the table keeps
+# numbers, coordinates that are on the map, ward ranges that go forwards,
+# and no row that repeats a key already in the table or earlier in the
+# file. validate() only reports; the valid rows are then written in one
+# store.add_many, so an import lands completely or not at all.
+# Row numbers in the report are the file's own lines (the header is row 1).
+
+CHUNK=10_000
+FORMATS=["csv","xlsx"] if openpyxl else ["csv"]
+
+# rows are duplicates when any of these column sets match (ignoring case and
+# surrounding spaces); the first set is required, the others are checked
+# only where filled in
+KEYS={
+    "families":[("Family_ID",)],
+    "pupils":[("Name","Family_ID"),("Voter_ID",)],
+    "places":[("Name","Type")],
+    "team":[("Name","Role")],
+    "leagues":[("Sport","Season")],
+    "ward_ranges":[("Ward",)],
+    "youth":[("Youth_Name",)],
+}
+# columns the portal adds to a table's view (and so to its exports) that
+# are worked out, not stored: an import of such an export ignores them
+DERIVED={"pupils":["Ward"]}
+WHOLE={"Age":(0,130),"Ward":(0,None),"Start":(0,None),"End":(0,None)}
+RANGES={"Latitude":(-90,90),"Longitude":(-180,180)}
+ERRORS=["Row","Column","Value","Error"]
+
+
+# ---------------- READING ----------------
+def _cell(v):
+    if v is None:
+        return ""
+    if isinstance(v,float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _excel_chunks(upload,chunksize):
+    book=openpyxl.load_workbook(upload,read_only=True,data_only=True)
+    rows=book.active.iter_rows(values_only=True)
+    header=[_cell(c) for c in next(rows,())]
+    batch=[]
+    for row in rows:
+        batch.append([_cell(c) for c in row[:len(header)]])
+        if len(batch)==chunksize:
+            yield pd.DataFrame(batch,columns=header)
+            batch=[]
+    if batch or not header:
+        yield pd.DataFrame(batch,columns=header)
+    book.close()
+
+
+def chunks(upload,chunksize=CHUNK):
+    if str(getattr(upload,"name","")).lower().endswith(".xlsx"):
+        if openpyxl is None:
+            raise ValueError("Excel files need openpyxl (pip install openpyxl); upload a CSV instead")
+        return _excel_chunks(upload,chunksize)
+    return pd.read_csv(upload,dtype=str,keep_default_na=False,chunksize=chunksize)
+
+
+# ---------------- VALIDATION ----------------
+def _norm(col):
+    return col.astype(str).str.strip().str.casefold().str.replace(r"^(-?\d+)\.0+$",r"\1",regex=True)
+
+
+def key_of(df,cols):
+    parts=[_norm(df[c].astype(object).where(df[c].notna(),"")) for c in cols]
+    key=parts[0]
+    for p in parts[1:]:
+        key=key+"\x1f"+p
+    return key,np.logical_and.reduce([p!="" for p in parts])
+
+
+def check_columns(name,columns,existing):
+    missing=[c for c in SCHEMAS[name] if c not in columns]
+    unknown=[c for c in columns if c not in SCHEMAS[name] and c not in existing]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+
+
+def check_chunk(name,chunk,rows,seen):
+    errors=[]
+
+    def flag(mask,col,msg):
+        mask=np.asarray(mask,dtype=bool)
+        if mask.any():
+            errors.append(pd.DataFrame({"Row":rows[mask],"Column":col,
+                                        "Value":chunk[col].to_numpy()[mask] if col in chunk else "","Error":msg}))
+
+    filled=chunk.apply(lambda c:c.str.strip()!="")
+    required=KEYS[name][0]
+    for c in required:
+        flag(~filled[c],c,"required")
+
+    numbers={}
+    for c in chunk.columns.intersection(list(WHOLE)+list(RANGES)):
+        numbers[c]=pd.to_numeric(chunk[c].str.strip(),errors="coerce")
+        flag(filled[c]&numbers[c].isna(),c,"not a number")
+        lo,hi=WHOLE.get(c) or RANGES[c]
+        n=numbers[c]
+        if c in WHOLE:
+            flag(n.notna()&(n%1!=0),c,"not a whole number")
+        flag(n.notna()&((n<lo)|((n>hi) if hi is not None else False)),c,"out of range")
+    if {"Latitude","Longitude"}<=set(numbers):
+        flag((numbers["Latitude"]==0)&(numbers["Longitude"]==0),"Latitude","0,0 is not a location")
+    if {"Start","End"}<=set(numbers):
+        flag(numbers["Start"]>numbers["End"],"Start","Start is after End")
+
+    for i,cols in enumerate(KEYS[name]):
+        key,complete=key_of(chunk,cols)
+        dup=complete&(key.isin(seen[i])|key.duplicated()).to_numpy()
+        flag(dup,cols[0],f"duplicate {' + '.join(cols)}")
+
+    bad=np.zeros(len(chunk),dtype=bool)
+    for e in errors:
+        bad|=np.isin(rows,e["Row"].to_numpy())
+    for i,cols in enumerate(KEYS[name]):
+        key,complete=key_of(chunk[~bad],cols)
+        seen[i].update(key[complete])
+    return bad,errors
+
+
+def validate(name,upload,existing,chunksize=CHUNK):
+    seen=[]
+    for cols in KEYS[name]:
+        if set(cols)<=set(existing.columns):
+            key,complete=key_of(existing,cols)
+            seen.append(set(key[complete]))
+        else:
+            seen.append(set())
+
+    valid,errors,total=[],[],0
+    for chunk in chunks(upload,chunksize):
+        chunk.columns=[str(c).strip() for c in chunk.columns]
+        chunk=chunk.drop(columns=[c for c in DERIVED.get(name,[]) if c in chunk and c not in existing])
+        if total==0:
+            check_columns(name,list(chunk.columns),existing.columns)
+        rows=np.arange(total,total+len(chunk))+2
+        total+=len(chunk)
+        chunk=chunk.apply(lambda c:c.str.strip())
+        bad,found=check_chunk(name,chunk,rows,seen)
+        valid.append(chunk[~bad])
+        errors+=found
+
+    errors=pd.concat(errors).sort_values("Row",kind="stable") if errors else pd.DataFrame(columns=ERRORS)
+    rows=pd.concat(valid,ignore_index=True) if valid else pd.DataFrame(columns=SCHEMAS[name])
+    return {"rows":rows,"errors":errors.reset_index(drop=True),"total":total}
+
+
+# ---------------- EXPORT ----------------
+def export(df,fmt="csv",chunksize=CHUNK):
+    # bytes, as st.download_button wants them; built only when clicked
+    out=io.BytesIO()
+    if fmt=="xlsx":
+        book=openpyxl.Workbook(write_only=True)
+        sheet=book.create_sheet()
+        sheet.append([str(c) for c in df.columns])
+        for start in range(0,len(df),chunksize):
+            part=df.iloc[start:start+chunksize].astype(object)
+            for row in part.where(part.notna(),None).itertuples(index=False):
+                sheet.append(list(row))
+        book.save(out)
+    else:
+        for start in range(0,max(len(df),1),chunksize):
+            out.write(df.iloc[start:start+chunksize].to_csv(index=False,header=start==0).encode("utf-8"))
+    return out.getvalue()
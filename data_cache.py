@@ -0,0 +1,83 @@
+import os
+import threading
+
+import pandas as pd
+
+
+# ---------------- SHARED TABLE CACHE ----------------
+# One copy of every table per process, shared by all sessions. An entry is
+# reused while the file's (mtime, size) is unchanged, so a rerun costs a
+# stat() per table instead of a read_csv, and nothing is hashed. Callers
+# get shallow copies: with copy-on-write a session editing its frame never
+# touches the shared one. Sources other than a CSV file (see storage.py)
+# pass their own version and reader.
+
+if int(pd.__version__.split(".")[0])<3:
+    pd.set_option("mode.copy_on_write",True)
+
+_lock=threading.Lock()
+_tables={}
+_derived={}
+stats={"hits":0,"misses":0}   # read by perf.py
+
+
+def _key(path):
+    return os.path.abspath(path)
+
+
+def version(path):
+    try:
+        st=os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns,st.st_size)
+
+
+def _load(path,v=None,read=None):
+    key=_key(path)
+    if read is None:
+        v=version(key)
+        read=lambda:pd.read_csv(key) if v else pd.DataFrame()
+    with _lock:
+        hit=_tables.get(key)
+    if hit and hit[0]==v:
+        stats["hits"]+=1
+        return hit
+
+    stats["misses"]+=1
+    entry=(v,read())
+    with _lock:
+        _tables[key]=entry
+    return entry
+
+
+def table(path,v=None,read=None):
+    return _load(path,v,read)[1].copy(deep=False)
+
+
+def derived(path,name,build,v=None,read=None):
+    key=(_key(path),name)
+    v,df=_load(path,v,read)
+    with _lock:
+        hit=_derived.get(key)
+    if hit and hit[0]==v:
+        stats["hits"]+=1
+        return hit[1]
+
+    stats["misses"]+=1
+    obj=build(df)
+    with _lock:
+        _derived[key]=(v,obj)
+    return obj
+
+
+def invalidate(path=None):
+    with _lock:
+        if path is None:
+            _tables.clear()
+            _derived.clear()
+            return
+        key=_key(path)
+        _tables.pop(key,None)
+        for k in [k for k in _derived if k[0]==key]:
+            del _derived[k]
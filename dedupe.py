@@ -0,0 +1,290 @@
+import functools
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from search_index import phonetic,trigrams,words
+
+
+# ---------------- DUPLICATE SUGGESTIONS ----------------
+# Likely duplicate rows in pupils, families and places, found without
+# comparing every pair. Each row gets blocking keys (its Voter_ID; its name
+# sounded out, word order ignored, with its age band; that name with its
+# family head's), and only rows sharing a key are compared. Blocks bigger
+# than MAX_BLOCK (a very common name) are skipped. Candidate pairs are
+# scored from name similarity, age, Voter_ID and family, and pairs scoring
+# MIN_SCORE or more are suggested for merging.
+#
+# Work is incremental: when a table changes, only the blocks that a
+# changed, added or removed row belonged to are paired again, and only
+# pairs with a changed row are scored again. Pairs an admin marks as not
+# duplicates are remembered in dedupe.json.
+
+MAX_BLOCK=50
+MIN_SCORE=0.75
+
+
+@functools.lru_cache(maxsize=None)
+def name_key(text):
+    return " ".join(sorted(phonetic(w) for w in words(text)))
+
+
+@functools.lru_cache(maxsize=None)
+def grams(text):
+    ws=words(text)
+    return frozenset(trigrams("  "+" ".join(sorted(ws))+" ")) if ws else frozenset()
+
+
+def similarity(a,b):
+    ga,gb=grams(a),grams(b)
+    return len(ga&gb)/len(ga|gb) if ga and gb else 0.0
+
+
+def _text(col):
+    return col.astype(object).where(col.notna(),"").astype(str).str.strip()
+
+
+def _key(col):
+    # str even when empty: .map() on an empty column comes back float64
+    return col.map(name_key).astype(str)
+
+
+def _keyed(key,*parts):
+    ok=key!=""
+    out=key
+    for p in parts:
+        ok&=p!=""
+        out=out+"|"+p
+    return out.where(ok,"")
+
+
+# ---------------- FEATURES ----------------
+# one frame per table: block keys (BLOCKS) plus the fields the score reads
+def pupil_features(store):
+    df=store.read("pupils")
+    fam=store.read("families")
+    name=_text(df["Name"])
+    key=_key(name)
+    age=pd.to_numeric(df["Age"],errors="coerce").astype("float64")
+    family=_text(df["Family_ID"])
+    heads=dict(zip(_text(fam["Family_ID"]),_key(_text(fam["Head_of_Family"]))))
+    head=family.map(heads).fillna("").astype(str)
+
+    def band(shift):
+        return ((age+shift)//10).astype("Int64").astype(str).where(age.notna(),"")
+
+    return pd.DataFrame({
+        "voter":_text(df["Voter_ID"]).str.casefold().str.replace(r"\.0+$","",regex=True),
+        "name_age":_keyed(key,band(0)),
+        "name_age_shifted":_keyed(key,band(5)),   # neighbours across a band edge
+        "name_head":_keyed(key,head),
+        "name":name,"age":age,"family":family,"head":head,
+    },index=df.index)
+
+
+def family_features(store):
+    df=store.read("families")
+    head=_text(df["Head_of_Family"])
+    address=_text(df["Address"]) if "Address" in df else pd.Series("",index=df.index)
+    return pd.DataFrame({"head_key":_key(head),"name":head,"address":address},index=df.index)
+
+
+def place_features(store):
+    df=store.read("places")
+    name=_text(df["Name"])
+    return pd.DataFrame({"name_key":_key(name),"name":name,"type":_text(df["Type"]).str.casefold()},index=df.index)
+
+
+# ---------------- SCORES ----------------
+def _names(A,B):
+    return np.array([similarity(x,y) for x,y in zip(A["name"],B["name"])])
+
+
+def _reasons(*parts):
+    return ["; ".join(r for r in row if r) for row in zip(*parts)]
+
+
+def score_pupils(A,B):
+    name=_names(A,B)
+    diff=np.abs(A["age"].to_numpy()-B["age"].to_numpy())
+    age=np.where(np.isnan(diff),0.5,np.where(diff<=1,1.0,np.where(diff<=3,0.5,0.0)))
+    va,vb=A["voter"].to_numpy(),B["voter"].to_numpy()
+    same_voter=(va==vb)&(va!="")
+    other_voter=(va!=vb)&(va!="")&(vb!="")
+    same_family=(A["family"].to_numpy()==B["family"].to_numpy())&(A["family"].to_numpy()!="")
+    same_head=(A["head"].to_numpy()==B["head"].to_numpy())&(A["head"].to_numpy()!="")
+
+    score=0.6*name+0.25*age+0.15*(same_family|same_head)
+    score=np.where(same_voter,np.maximum(score,0.9),score)
+    score=np.where(other_voter,score*0.5,score)
+    reasons=_reasons(
+        np.where(same_voter,"same Voter_ID",np.where(other_voter,"different Voter_ID","")),
+        [f"name {s:.0%}" for s in name],
+        np.where(np.isnan(diff),"",np.where(diff==0,"same age","ages "+A["age"].astype("Int64").astype(str)+"/"+B["age"].astype("Int64").astype(str))),
+        np.where(same_family,"same family",np.where(same_head,"same family head","")),
+    )
+    return score,reasons
+
+
+def score_families(A,B):
+    head=_names(A,B)
+    address=np.array([similarity(x,y) if x or y else 0.5 for x,y in zip(A["address"],B["address"])])
+    score=0.7*head+0.3*address
+    return score,_reasons([f"head {s:.0%}" for s in head],[f"address {s:.0%}" for s in address])
+
+
+def score_places(A,B):
+    name=_names(A,B)
+    same_type=A["type"].to_numpy()==B["type"].to_numpy()
+    score=0.7*name+0.3*same_type
+    return score,_reasons([f"name {s:.0%}" for s in name],np.where(same_type,"same type","different type"))
+
+
+# per table: the tables its features read, its block keys, scorer and how
+# a row is described in a suggestion
+SPECS={
+    "pupils":{"tables":("pupils","families"),"features":pupil_features,"score":score_pupils,
+              "blocks":["voter","name_age","name_age_shifted","name_head"],"label":["Name","Family_ID","Age","Voter_ID"]},
+    "families":{"tables":("families",),"features":family_features,"score":score_families,
+                "blocks":["head_key"],"label":["Family_ID","Head_of_Family","Address"]},
+    "places":{"tables":("places",),"features":place_features,"score":score_places,
+              "blocks":["name_key"],"label":["Name","Type"]},
+}
+PAIRS=["a","b","key","block"]
+
+
+# ---------------- CANDIDATE PAIRS ----------------
+def block_pairs(col,key,only=None):
+    s=col[col!=""]
+    if only is not None:
+        s=s[s.isin(list(only))]
+    sizes=s.map(s.value_counts())
+    s=s[(sizes>1)&(sizes<=MAX_BLOCK)]
+    left=pd.DataFrame({"a":s.index.to_numpy(),"block":s.to_numpy()})
+    pairs=left.merge(left.rename(columns={"a":"b"}),on="block")
+    pairs=pairs[pairs["a"]<pairs["b"]]
+    return pairs.assign(key=key)[PAIRS]
+
+
+def _changed(old,new):
+    diff=np.zeros(len(new),dtype=bool)
+    for c in new.columns:
+        a,b=old[c],new[c]
+        diff|=~((a==b).fillna(False).to_numpy(dtype=bool)|(a.isna()&b.isna()).to_numpy())
+    return diff
+
+
+def refresh(spec,state,f):
+    if state is None:
+        dirty=f.index
+        touched={k:None for k in spec["blocks"]}
+        kept=[]
+        old_scores=None
+    else:
+        old=state["features"]
+        common=f.index.intersection(old.index)
+        changed=common[_changed(old.loc[common],f.loc[common])]
+        gone=old.index.difference(f.index)
+        dirty=changed.union(f.index.difference(old.index))
+        touched={k:(set(old.loc[changed.union(gone),k])|set(f.loc[dirty,k]))-{""} for k in spec["blocks"]}
+        pairs=state["pairs"]
+        kept=[pairs[(pairs["key"]==k)&~pairs["block"].isin(list(touched[k]))] for k in spec["blocks"]]
+        old_scores=state["scores"]
+
+    fresh=[block_pairs(f[k],k,touched[k]) for k in spec["blocks"] if touched[k] is None or touched[k]]
+    pairs=pd.concat(kept+fresh,ignore_index=True) if kept or fresh else pd.DataFrame(columns=PAIRS)
+    unique=pairs[["a","b"]].drop_duplicates()
+
+    # keep the scores of pairs where neither row changed
+    reuse=pd.DataFrame(columns=["a","b","Score","Reasons"])
+    todo=unique
+    if old_scores is not None and len(unique):
+        clean=~unique["a"].isin(dirty)&~unique["b"].isin(dirty)
+        reuse=unique[clean].merge(old_scores,on=["a","b"])
+        todo=unique[~clean]
+    if len(todo):
+        A=f.loc[todo["a"].to_numpy()].reset_index(drop=True)
+        B=f.loc[todo["b"].to_numpy()].reset_index(drop=True)
+        score,reasons=spec["score"](A,B)
+        todo=todo.assign(Score=np.round(score,3),Reasons=reasons)
+    else:
+        todo=todo.assign(Score=[],Reasons=[])
+    scores=pd.concat([reuse,todo],ignore_index=True) if len(reuse) else todo.reset_index(drop=True)
+    return {"features":f,"pairs":pairs,"scores":scores}
+
+
+# ---------------- ENGINE ----------------
+class Deduper:
+
+    def __init__(self,store,path):
+        self.store=store
+        self.path=Path(path)
+        self._lock=threading.Lock()
+        self.state={}
+        try:
+            saved=json.loads(self.path.read_text())
+        except (OSError,ValueError):
+            saved={}
+        self.dismissed={name:{tuple(p) for p in pairs} for name,pairs in saved.get("dismissed",{}).items()}
+
+    def _refresh(self,name):
+        spec=SPECS[name]
+        version=tuple(self.store.version(t) for t in spec["tables"])
+        state=self.state.get(name)
+        if state and state["version"]==version:
+            return state
+        state=refresh(spec,state,spec["features"](self.store))
+        state["version"]=version
+        self.state[name]=state
+        return state
+
+    def suggestions(self,name,min_score=MIN_SCORE):
+        with self._lock:
+            scores=self._refresh(name)["scores"]
+            dismissed=self.dismissed.get(name,set())
+        found=scores[scores["Score"]>=min_score]
+        if dismissed:
+            found=found[[(a,b) not in dismissed for a,b in zip(found["a"],found["b"])]]
+        return found.sort_values(["Score","a","b"],ascending=[False,True,True],kind="stable").reset_index(drop=True)
+
+    def dismiss(self,name,a,b):
+        with self._lock:
+            self.dismissed.setdefault(name,set()).add((int(min(a,b)),int(max(a,b))))
+            data={"dismissed":{n:sorted(p) for n,p in self.dismissed.items()}}
+            tmp=self.path.with_name(self.path.name+".tmp")
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp,self.path)
+
+
+@functools.lru_cache(maxsize=None)
+def engine(store,base_dir):
+    return Deduper(store,Path(base_dir)/"dedupe.json")
+
+
+def describe(df,name,keys):
+    cols=[c for c in SPECS[name]["label"] if c in df]
+    rows=df.loc[keys,cols]
+    return _text(rows.iloc[:,0]).str.cat([_text(rows[c]) for c in cols[1:]],sep=" · ").tolist()
+
+
+def merge(stats,df,name,keep,drop):
+    # fill the kept row's blanks from the other, then delete the other
+    kept,other=df.loc[keep],df.loc[drop]
+    fill={c:other[c] for c in df.columns if pd.isna(kept[c]) and not pd.isna(other[c])}
+    if name=="families":
+        rehome(stats,other["Family_ID"],fill.get("Family_ID",kept["Family_ID"]))
+    if fill:
+        stats.update(name,keep,{c:str(v) for c,v in fill.items()})
+    stats.delete(name,drop)
+
+
+def rehome(stats,old,new):
+    # the dropped family's members move to the kept one before it goes
+    if pd.isna(old) or pd.isna(new) or str(old).strip()==str(new).strip():
+        return
+    for key in stats.store.find("pupils","Family_ID",old).index:
+        stats.update("pupils",key,{"Family_ID":str(new)})
@@ -0,0 +1,141 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+
+
+# ---------------- POINTS OF INTEREST ----------------
+# Every table with coordinates becomes one point store: places (by their
+# Type) plus hospitals, offices and shops once those files get Latitude and
+# Longitude columns. PointIndex buckets the points into a grid of CELL_M
+# metre squares on a local flat projection (exact enough across a village
+# or a district), so nearest / within-radius / viewport queries only look at
+# the few cells they touch. The index is rebuilt when any source changes.
+
+SOURCES={
+    "places":("Name","Type"),
+    "hospitals":("Hospital_Name","Hospital"),
+    "offices":("Office_Name","Office"),
+    "shops":("Shop_Name","Shop"),
+}
+COLUMNS=["Name","Category","Source","Latitude","Longitude"]
+EARTH_M=6_371_000
+CELL_M=250
+
+
+def valid_points(df,name="Name"):
+    if not {"Latitude","Longitude"}.issubset(df.columns):
+        return pd.DataFrame(columns=["Latitude","Longitude","Name"])
+    lat=pd.to_numeric(df["Latitude"],errors="coerce")
+    lon=pd.to_numeric(df["Longitude"],errors="coerce")
+    ok=lat.between(-90,90)&lon.between(-180,180)&~((lat==0)&(lon==0))
+    names=df[name] if name in df else pd.Series("",index=df.index)
+    return pd.DataFrame({"Latitude":lat[ok],"Longitude":lon[ok],"Name":names[ok].fillna("").astype(str)})
+
+
+def points(store):
+    parts=[]
+    for source,(name,category) in SOURCES.items():
+        df=store.read(source)
+        p=valid_points(df,name)
+        if len(p):
+            kind=df.loc[p.index,category].fillna("").astype(str) if category in df else category
+            parts.append(p.assign(Category=kind,Source=source))
+    if not parts:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(parts,ignore_index=True)[COLUMNS]
+
+
+class PointIndex:
+
+    def __init__(self,points,cell_m=CELL_M):
+        self.points=points.reset_index(drop=True)
+        self.cell=cell_m
+        lat=self.points["Latitude"].to_numpy(dtype=float)
+        lon=self.points["Longitude"].to_numpy(dtype=float)
+        self.cos0=np.cos(np.radians(lat.mean())) if len(lat) else 1.0
+        self.x,self.y=self.project(lat,lon)
+        self.category=self.points["Category"].to_numpy(dtype=object)
+        self.categories=sorted(set(self.category))
+        cx=np.floor(self.x/cell_m).astype(np.int64)
+        cy=np.floor(self.y/cell_m).astype(np.int64)
+        self.cells=pd.Series(np.arange(len(lat))).groupby([cx,cy]).indices if len(lat) else {}
+        self.extent=(self.x.min(),self.y.min(),self.x.max(),self.y.max()) if len(lat) else None
+
+    def __len__(self):
+        return len(self.points)
+
+    def project(self,lat,lon):
+        lat=np.radians(np.asarray(lat,dtype=float))
+        lon=np.radians(np.asarray(lon,dtype=float))
+        return EARTH_M*lon*self.cos0,EARTH_M*lat
+
+    def _candidates(self,x0,y0,x1,y1):
+        i0,i1=int(np.floor(x0/self.cell)),int(np.floor(x1/self.cell))
+        j0,j1=int(np.floor(y0/self.cell)),int(np.floor(y1/self.cell))
+        if (i1-i0+1)*(j1-j0+1)>len(self.cells):
+            # a box wider than the data (zoomed far out): one vectorised scan
+            return np.flatnonzero((self.x>=x0)&(self.x<=x1)&(self.y>=y0)&(self.y<=y1))
+        hits=[self.cells[(i,j)] for i in range(i0,i1+1) for j in range(j0,j1+1) if (i,j) in self.cells]
+        return np.concatenate(hits) if hits else np.empty(0,dtype=np.int64)
+
+    def _of(self,idx,category):
+        return idx if category is None else idx[self.category[idx]==category]
+
+    def _rows(self,idx,dist=None):
+        rows=self.points.iloc[idx]
+        return rows if dist is None else rows.assign(Distance_m=np.round(dist,1))
+
+    # ---------------- QUERIES ----------------
+    def within(self,lat,lon,radius_m,category=None):
+        x,y=self.project(lat,lon)
+        idx=self._of(self._candidates(x-radius_m,y-radius_m,x+radius_m,y+radius_m),category)
+        d=np.hypot(self.x[idx]-x,self.y[idx]-y)
+        keep=d<=radius_m
+        order=np.argsort(d[keep],kind="stable")
+        return self._rows(idx[keep][order],d[keep][order])
+
+    def nearest(self,lat,lon,n=5,category=None):
+        if not len(self) or n<=0:
+            return self._rows(np.empty(0,dtype=np.int64),np.empty(0))
+        x,y=self.project(lat,lon)
+        x0,y0,x1,y1=self.extent
+        reach=max(abs(x-x0),abs(x-x1),abs(y-y0),abs(y-y1))
+        gap=max(x0-x,x-x1,y0-y,y-y1,0)   # from a point outside the data, start at its edge
+        r=max(self.cell,gap)
+        while True:
+            idx=self._of(self._candidates(x-r,y-r,x+r,y+r),category)
+            d=np.hypot(self.x[idx]-x,self.y[idx]-y)
+            # done once the n-th hit is inside the searched square's circle
+            if (len(idx)>=n and np.partition(d,n-1)[n-1]<=r) or r>=reach:
+                break
+            r*=2
+        if len(d)>n:
+            top=np.argpartition(d,n-1)[:n]
+            idx,d=idx[top],d[top]
+        order=np.argsort(d,kind="stable")
+        return self._rows(idx[order],d[order])
+
+    def bbox(self,south,west,north,east,category=None,limit=None):
+        x0,y0=self.project(south,west)
+        x1,y1=self.project(north,east)
+        idx=self._of(self._candidates(x0,y0,x1,y1),category)
+        lat=self.points["Latitude"].to_numpy()[idx]
+        lon=self.points["Longitude"].to_numpy()[idx]
+        idx=idx[(lat>=south)&(lat<=north)&(lon>=west)&(lon<=east)]
+        if limit is not None and len(idx)>limit:
+            # keep the ones nearest the middle of the view
+            cx,cy=(x0+x1)/2,(y0+y1)/2
+            idx=idx[np.argpartition(np.hypot(self.x[idx]-cx,self.y[idx]-cy),limit)[:limit]]
+        return self._rows(np.sort(idx))
+
+
+def derived(store,base_dir,key,build):
+    versions=tuple(store.version(name) for name in SOURCES)
+    return data_cache.derived(Path(base_dir)/"points",key,build,versions,lambda:points(store))
+
+
+def index(store,base_dir):
+    return derived(store,base_dir,"grid",PointIndex)
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+import streamlit as st
+from PIL import Image, ImageOps, features
+
+
+# ---------------- IMAGE DERIVATIVES ----------------
+# Every uploaded photo gets a small thumbnail (gallery grid, dashboard
+# highlights) and a display-size copy, saved next to the original as
+# <name>.thumb.webp / <name>.display.webp. Both are re-encoded without
+# EXIF. Pages only ever send these; the original is read on demand, and
+# files Pillow cannot read are left out.
+# Missing or outdated derivatives are rebuilt the first time they are asked
+# for, so photos uploaded before this existed are covered too.
+
+SIZES={"thumb":480,"display":1280}
+CHUNK=1<<20
+
+# gallery.csv columns; SHA256/Size/Width/Height describe the stored file
+GALLERY=["Image","SHA256","Size","Width","Height"]
+EXT=".webp" if features.check("webp") else ".jpg"
+QUALITY=80
+
+
+def derivative_path(path,kind):
+    path=Path(path)
+    return path.with_name(f"{path.stem}.{kind}{EXT}")
+
+
+def _save(img,out,size):
+    copy=img.copy()
+    copy.thumbnail((size,size))
+    if EXT==".jpg" or copy.mode not in ("RGB","RGBA"):
+        copy=copy.convert("RGBA" if EXT==".webp" and "A" in copy.getbands() else "RGB")
+    copy.save(out,quality=QUALITY)
+
+
+def make_derivatives(path):
+    with Image.open(path) as img:
+        # let JPEG decode at reduced scale when the photo is far larger
+        img.draft("RGB",(max(SIZES.values()),)*2)
+        img=ImageOps.exif_transpose(img)
+        for kind,size in SIZES.items():
+            _save(img,derivative_path(path,kind),size)
+
+
+def process_upload(path):
+    try:
+        make_derivatives(path)
+        return True
+    except (OSError,Image.DecompressionBombError):
+        return False
+
+
+def derivative(path,kind):
+    path=Path(path)
+    out=derivative_path(path,kind)
+    try:
+        if not out.exists() or out.stat().st_mtime<path.stat().st_mtime:
+            make_derivatives(path)
+    except (OSError,Image.DecompressionBombError):
+        # not an image Pillow can read
+        return None
+    return out
+
+
+def thumbnail(path):
+    return derivative(path,"thumb")
+
+
+def display(path):
+    return derivative(path,"display")
+
+
+def remove(path):
+    for kind in SIZES:
+        derivative_path(path,kind).unlink(missing_ok=True)
+    Path(path).unlink(missing_ok=True)
+
+
+# ---------------- CONTENT-ADDRESSED UPLOADS ----------------
+# Uploads are copied to disk a chunk at a time while hashing, then stored as
+# <sha256><ext>. The same photo uploaded twice (or re-sent by the uploader
+# on a rerun) lands on the same file, and is_known() lets the caller skip
+# the duplicate row.
+
+def dimensions(path):
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except (OSError,Image.DecompressionBombError):
+        return None,None
+
+
+def store_upload(upload,folder):
+    folder=Path(folder)
+    folder.mkdir(parents=True,exist_ok=True)
+    digest=hashlib.sha256()
+    size=0
+
+    fd,tmp=tempfile.mkstemp(dir=folder,suffix=".part")
+    try:
+        with os.fdopen(fd,"wb") as f:
+            upload.seek(0)
+            while chunk:=upload.read(CHUNK):
+                digest.update(chunk)
+                f.write(chunk)
+                size+=len(chunk)
+        path=folder/f"{digest.hexdigest()}{Path(upload.name).suffix.lower() or '.jpg'}"
+        if path.exists():
+            os.remove(tmp)
+        else:
+            os.replace(tmp,path)
+            process_upload(path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+    width,height=dimensions(path)
+    return {"path":path,"SHA256":digest.hexdigest(),"Size":size,"Width":width,"Height":height}
+
+
+def is_known(df,digest):
+    return "SHA256" in df and bool((df["SHA256"]==digest).any())
+
+
+# ---------------- GALLERY GRID ----------------
+def gallery_grid(paths,key,columns=2):
+    opened=st.session_state.get(f"{key}_open")
+    if opened and display(opened):
+        st.image(str(display(opened)),width="stretch")
+        with open(opened,"rb") as f:
+            st.download_button("Download original",f.read(),file_name=Path(opened).name,key=f"{key}_download")
+        if st.button("Close",key=f"{key}_close"):
+            del st.session_state[f"{key}_open"]
+            st.rerun()
+        st.divider()
+
+    thumbs=[(path,thumbnail(path)) for path in paths]
+    thumbs=[(path,thumb) for path,thumb in thumbs if thumb]
+    cols=st.columns(columns)
+    for i,(path,thumb) in enumerate(thumbs):
+        with cols[i%columns]:
+            st.image(str(thumb),width="stretch")
+            if st.button("View",key=f"{key}_view_{i}"):
+                st.session_state[f"{key}_open"]=str(path)
+                st.rerun()
@@ -0,0 +1,269 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+import snapshots
+
+try:
+    import fcntl
+except ImportError:
+    fcntl=None
+    import msvcrt
+
+
+# ---------------- CHANGE JOURNAL ----------------
+# Admin edits to a CSV table are appended to <table>.journal as JSON lines
+# (add / update / delete by row id) instead of rewriting the CSV. The table
+# is the CSV snapshot with the journal replayed on top. Once the journal
+# passes COMPACT_BYTES it is folded back into the CSV in the background.
+# Bulk adds (extend) fold the journal in and rewrite the CSV right away.
+#
+# Row ids are the index labels of the replayed frame: snapshot rows are
+# numbered from the header's id runs (positions for a fresh snapshot), adds
+# take the next id. Ids only ever grow, so they stay ascending and survive
+# compaction. The header also records the snapshot's size; if the CSV no
+# longer matches (edited by hand, or a crash mid-compaction after the CSV
+# was replaced) the CSV wins and the journal's ids no longer mean anything.
+#
+# So that a hand edit finds nothing pending, the journal is also folded in
+# once writes have been idle for IDLE_SECONDS, and at startup (settle).
+# A journal that is stale all the same is never overwritten: the next write,
+# settle or orphaned() moves it to <table>.journal.orphaned-<time> and
+# starts a fresh one. orphaned() lists those files for the admin pages.
+
+COMPACT_BYTES=256*1024
+IDLE_SECONDS=30
+
+
+@contextmanager
+def locked(path,exclusive=True):
+    with open(path,"a+b") as f:
+        if fcntl:
+            fcntl.flock(f,fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(),msvcrt.LK_LOCK,1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f,fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(),msvcrt.LK_UNLCK,1)
+
+
+def _json(v):
+    return v.item() if hasattr(v,"item") else str(v)
+
+
+def runs(ids):
+    out=[]
+    for i in ids:
+        if out and out[-1][1]==i:
+            out[-1][1]=i+1
+        else:
+            out.append([i,i+1])
+    return out
+
+
+def expand(id_runs):
+    return [i for start,stop in id_runs for i in range(start,stop)]
+
+
+def _size(path):
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return None
+
+
+def _write_synced(path,write):
+    tmp=path.with_name(path.name+".tmp")
+    with open(tmp,"w",encoding="utf-8",newline="") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp,path)
+
+
+class Journal:
+
+    def __init__(self,csv_path):
+        self.csv_path=Path(csv_path)
+        self.path=self.csv_path.with_suffix(".journal")
+        self.lock_path=self.csv_path.with_suffix(".lock")
+        self._compacting=threading.Lock()
+        self._idle=None
+
+    def size(self):
+        return _size(self.path) or 0
+
+    def orphaned(self):
+        header=self._header()
+        if header is not None and header.get("csv_size")!=_size(self.csv_path):
+            with locked(self.lock_path):
+                self._set_aside()
+        return sorted(self.path.parent.glob(self.path.name+".orphaned-*"))
+
+    def _header(self):
+        try:
+            with open(self.path,encoding="utf-8") as f:
+                line=f.readline()
+        except FileNotFoundError:
+            return None
+        if not line.endswith("\n"):
+            return None
+        rec=json.loads(line)
+        return None if "op" in rec else rec
+
+    def _records(self):
+        header,ops={},[]
+        if not self.path.exists():
+            return header,ops
+        with open(self.path,encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break   # torn tail of an interrupted append
+                rec=json.loads(line)
+                if "op" in rec:
+                    ops.append(rec)
+                else:
+                    header=rec
+        return header,ops
+
+    # ---------------- REPLAY ----------------
+    def _text(self):
+        # the CSV cell for cell, for rewriting it: nothing inferred, so an
+        # id column with blanks keeps 9876543210 instead of 9876543210.0
+        if _size(self.csv_path) is None:
+            return pd.DataFrame()
+        return pd.read_csv(self.csv_path,dtype=str,keep_default_na=False)
+
+    def _replay(self,text=False):
+        snapshot=self._text() if text else snapshots.read_csv(self.csv_path)
+        header,ops=self._records()
+        if header.get("csv_size")!=_size(self.csv_path):
+            header,ops={},[]
+
+        ids=expand(header["ids"]) if "ids" in header else range(len(snapshot))
+        snapshot.index=pd.Index(ids,dtype="int64")
+        next_id=header.get("next",len(snapshot))
+
+        known=set(snapshot.index)
+        added,changes,deleted={},{},set()
+        for op in ops:
+            kind=op["op"]
+            if kind=="add":
+                added[next_id]=dict(op["row"])
+                next_id+=1
+            elif kind=="update":
+                i=op["id"]
+                if i in added:
+                    added[i].update(op["row"])
+                elif i in known and i not in deleted:
+                    changes.setdefault(i,{}).update(op["row"])
+            elif kind=="delete":
+                i=op["id"]
+                added.pop(i,None)
+                changes.pop(i,None)
+                if i in known:
+                    deleted.add(i)
+
+        df=snapshot.drop(index=list(deleted))
+        if changes:
+            cols={c for row in changes.values() for c in row}
+            df=df.astype({c:object for c in cols if c in df})
+            for i,row in changes.items():
+                df.loc[i,list(row)]=list(row.values())
+        if added:
+            df=pd.concat([df,pd.DataFrame(list(added.values()),index=pd.Index(list(added),dtype="int64"))])
+        df.attrs["next_id"]=next_id
+        return df
+
+    def read(self):
+        with locked(self.lock_path,exclusive=False):
+            return self._replay()
+
+    # ---------------- WRITES ----------------
+    # all of these run under the exclusive lock
+    def _set_aside(self):
+        # the CSV changed behind the journal's back: replay ignores the old
+        # ops, so keep them in a backup and start over from this CSV
+        header=self._header()
+        if header is not None and header.get("csv_size")==_size(self.csv_path):
+            return
+        if self._records()[1]:
+            stamp=time.strftime("%Y%m%d-%H%M%S")
+            backup,n=self.path.with_name(f"{self.path.name}.orphaned-{stamp}"),1
+            while backup.exists():
+                n+=1
+                backup=self.path.with_name(f"{self.path.name}.orphaned-{stamp}-{n}")
+            os.replace(self.path,backup)
+        fresh={"csv_size":_size(self.csv_path)}
+        _write_synced(self.path,lambda f:f.write(json.dumps(fresh)+"\n"))
+
+    def append(self,op):
+        line=json.dumps(op,default=_json)+"\n"
+        with locked(self.lock_path):
+            self._set_aside()
+            with open(self.path,"a",encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+        if self.size()>COMPACT_BYTES:
+            self.compact_later()
+        self._compact_when_idle()
+
+    def _rewrite(self,df):
+        _write_synced(self.csv_path,lambda f:df.to_csv(f,index=False))
+        header={"csv_size":_size(self.csv_path),"ids":runs(int(i) for i in df.index),"next":df.attrs["next_id"]}
+        _write_synced(self.path,lambda f:f.write(json.dumps(header)+"\n"))
+
+    def compact(self):
+        with locked(self.lock_path):
+            self._set_aside()
+            if self._records()[1]:
+                self._rewrite(self._replay(text=True))
+
+    def settle(self):
+        # at startup: fold in what a previous run left, or set a stale journal aside
+        if self.path.exists():
+            self.compact()
+
+    def extend(self,rows):
+        # a bulk add goes straight into a rewritten CSV: one atomic replace
+        # instead of a journal line per row
+        if not rows:
+            return
+        with locked(self.lock_path):
+            self._set_aside()
+            df=self._replay(text=True)
+            start=df.attrs["next_id"]
+            added=pd.DataFrame(rows,index=pd.RangeIndex(start,start+len(rows)))
+            df=pd.concat([df,added]) if len(df.columns) else added
+            df.attrs["next_id"]=start+len(rows)
+            self._rewrite(df)
+
+    def compact_later(self):
+        if not self._compacting.acquire(blocking=False):
+            return
+        def run():
+            try:
+                self.compact()
+            finally:
+                self._compacting.release()
+        threading.Thread(target=run,daemon=True).start()
+
+    def _compact_when_idle(self):
+        # restarted on every write, so it fires IDLE_SECONDS after the last one
+        if self._idle is not None:
+            self._idle.cancel()
+        self._idle=threading.Timer(IDLE_SECONDS,self.compact_later)
+        self._idle.daemon=True
+        self._idle.start()
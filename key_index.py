@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+
+# ---------------- KEY INDEX ----------------
+# value -> row positions for one column of a table, built in one groupby
+# pass and cached per data version (see CsvStorage.find). Looking up a
+# household is then O(members) instead of a boolean mask over every row.
+
+class KeyIndex:
+
+    def __init__(self,df,column):
+        self.df=df
+        if column in df and len(df):
+            self.positions=df.groupby(column,sort=False).indices
+        else:
+            self.positions={}
+
+    def __contains__(self,key):
+        return key in self.positions
+
+    def rows(self,key):
+        pos=self.positions.get(key)
+        if pos is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[np.asarray(pos)]
+
+
+# ---------------- RECORD INDEX ----------------
+# natural key -> stable row ids (the journal id or SQLite _id, see
+# records.py). Keys are compared as trimmed, case-folded text, so a Voter_ID
+# typed as "222" finds one stored as 222 or "222.0".
+
+def key_text(values):
+    s=pd.Series(values,dtype=object)
+    s=s.where(s.notna(),"").astype(str).str.strip().str.casefold()
+    return s.str.replace(r"^(-?\d+)\.0+$",r"\1",regex=True)
+
+
+class RecordIndex:
+
+    def __init__(self,df,column):
+        self.ids=df.index.to_numpy()
+        if column in df and len(df):
+            self.positions=pd.Series(np.arange(len(df))).groupby(key_text(df[column].to_numpy()).to_numpy(),sort=False).indices
+            self.positions.pop("",None)
+        else:
+            self.positions={}
+
+    def __contains__(self,key):
+        return key_text([key]).iat[0] in self.positions
+
+    def rows(self,key):
+        pos=self.positions.get(key_text([key]).iat[0])
+        return [] if pos is None else self.ids[pos].tolist()
+
+
+def household_ids(persons,column="Family_ID"):
+    if column not in persons:
+        return []
+    return list(dict.fromkeys(persons[column].dropna()))
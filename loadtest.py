@@ -0,0 +1,191 @@
+import argparse
+import json
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+import streamlit_option_menu
+from streamlit.testing.v1 import AppTest
+
+from synthetic import write_village
+
+
+# ---------------- CONCURRENT SESSION LOAD TEST ----------------
+# Runs N simulated sessions of app.py at once with Streamlit's AppTest, each
+# following a scripted flow (login, search, page switches, admin edits), and
+# reports rerun latency percentiles, throughput and peak RSS per scenario.
+# AppTest keeps one global runtime per run, so sessions cannot share a
+# process: each gets its own, with its own cold table cache. All of them
+# work on one scratch copy of the portal, so admin edits contend on the same
+# files but never touch the real CSVs. Nothing leaves the machine.
+#
+#   python loadtest.py --sessions 20 --admins 2
+#   python loadtest.py --rows 100000 --out load.json
+
+ROOT=Path(__file__).parent
+PAGE="loadtest_page"
+QUERIES=["gudise","manga","F001","kumar"]
+
+
+# option_menu is a browser component and never answers under AppTest; the
+# patched one returns the page the scenario selected for this session
+def _menu(menu_title,options,*args,**kwargs):
+    return st.session_state.get(PAGE,options[0])
+
+
+def scratch_copy(rows=None,seed=0):
+    tmp=Path(tempfile.mkdtemp(prefix="village_load_"))
+    for path in ROOT.glob("*.py"):
+        shutil.copy(path,tmp)
+    shutil.copytree(ROOT/"views",tmp/"views",ignore=shutil.ignore_patterns("__pycache__"))
+    if rows:
+        write_village(tmp,rows,seed)
+    else:
+        for path in ROOT.glob("*.csv"):
+            shutil.copy(path,tmp)
+    return tmp
+
+
+# ---------------- SESSION ----------------
+def widget(elements,label):
+    return next(w for w in elements if w.label==label)
+
+
+class Session:
+
+    def __init__(self,app,timeout):
+        self.at=AppTest.from_file(str(app),default_timeout=timeout)
+        self.latencies=[]
+        self.errors=0
+
+    def rerun(self,action=None):
+        start=time.perf_counter()
+        (action or self.at).run()
+        self.latencies.append((time.perf_counter()-start)*1000)
+        if self.at.exception:
+            self.errors+=1
+
+    def open(self):
+        self.rerun()
+
+    def login(self,admin=False):
+        if admin:
+            self.rerun(self.at.selectbox[0].select("Admin"))
+            widget(self.at.text_input,"Admin ID").input("admin")
+            widget(self.at.text_input,"Password").input("admin123")
+            self.rerun(widget(self.at.button,"Login").click())
+        else:
+            widget(self.at.text_input,"Enter Name").input("Load Test")
+            self.rerun(widget(self.at.button,"Enter").click())
+
+    def goto(self,page):
+        self.at.session_state[PAGE]=page
+        self.rerun()
+
+    def search(self,query):
+        self.rerun(widget(self.at.text_input,"Search anything").input(query))
+
+    def add(self,values):
+        for label,value in values.items():
+            widget(self.at.text_input,label).input(value)
+        self.rerun(widget(self.at.button,"Add").click())
+
+
+# ---------------- SCENARIOS ----------------
+def user_flow(s,i):
+    s.open()
+    s.login()
+    for q in QUERIES:
+        s.search(q)
+    for page in ["Families","Pupils","Places","Dashboard"]:
+        s.goto(page)
+
+
+def admin_flow(s,i):
+    s.open()
+    s.login(admin=True)
+    s.search(QUERIES[i%len(QUERIES)])
+    s.goto("Families")
+    s.add({"Family_ID":f"LT{i:04d}","Head_of_Family":"LOAD TEST","Address":"Scratch"})
+    s.goto("Pupils")
+    s.add({"Name":"LOAD TEST","Family_ID":f"LT{i:04d}","Relation":"SON","Age":"30","Voter_ID":str(i)})
+    s.goto("Ward Settings")
+
+
+SCENARIOS={"user":user_flow,"admin":admin_flow}
+
+
+def peak_rss_mb():
+    rss=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss/(1024*1024 if sys.platform=="darwin" else 1024)
+
+
+def run_session(app,scenario,i,timeout):
+    streamlit_option_menu.option_menu=_menu
+    s=Session(app,timeout)
+    start=time.time()
+    try:
+        SCENARIOS[scenario](s,i)
+    except StopIteration:
+        s.errors+=1   # an expected widget never rendered; the flow stops here
+    return {"scenario":scenario,"latencies":s.latencies,"errors":s.errors,
+            "start":start,"end":time.time(),"rss_mb":peak_rss_mb()}
+
+
+def summary(done):
+    ms=np.array([x for d in done for x in d["latencies"]])
+    wall=max(d["end"] for d in done)-min(d["start"] for d in done)
+    return {
+        "sessions":len(done),
+        "reruns":len(ms),
+        "errors":sum(d["errors"] for d in done),
+        "p50_ms":round(float(np.percentile(ms,50)),1),
+        "p95_ms":round(float(np.percentile(ms,95)),1),
+        "p99_ms":round(float(np.percentile(ms,99)),1),
+        "max_ms":round(float(ms.max()),1),
+        "reruns_per_s":round(len(ms)/wall,2),
+        "peak_rss_mb":round(max(d["rss_mb"] for d in done),1),
+    }
+
+
+def run(sessions=10,admins=1,rows=None,timeout=60):
+    app_dir=scratch_copy(rows)
+    plan=[("admin" if i<admins else "user",i) for i in range(sessions)]
+    try:
+        start=time.perf_counter()
+        with ProcessPoolExecutor(max_workers=sessions) as pool:
+            futures=[pool.submit(run_session,app_dir/"app.py",name,i,timeout) for name,i in plan]
+            done=[f.result() for f in futures]
+        wall=time.perf_counter()-start
+    finally:
+        shutil.rmtree(app_dir,ignore_errors=True)
+
+    return {
+        "sessions":sessions,
+        "rows":rows,
+        "wall_s":round(wall,2),
+        "scenarios":{name:summary([d for d in done if d["scenario"]==name])
+                     for name in SCENARIOS if any(d["scenario"]==name for d in done)},
+    }
+
+
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Simulate concurrent portal sessions with AppTest.")
+    parser.add_argument("--sessions",type=int,default=10)
+    parser.add_argument("--admins",type=int,default=1,help="how many of the sessions run the admin flow")
+    parser.add_argument("--rows",type=int,help="use a synthetic village of this size instead of the repo's CSVs")
+    parser.add_argument("--timeout",type=float,default=60,help="seconds allowed per rerun")
+    parser.add_argument("--out",help="write the JSON report here instead of stdout")
+    args=parser.parse_args()
+
+    report=json.dumps(run(args.sessions,args.admins,args.rows,args.timeout),indent=2)
+    if args.out:
+        Path(args.out).write_text(report+"\n")
+    else:
+        print(report)
@@ -0,0 +1,57 @@
+import math
+
+import streamlit as st
+
+import perf
+
+
+# ---------------- PAGED TABLE ----------------
+# Filter, sort and slice on the server and hand st.dataframe only the
+# visible page, so a large table never goes to the browser whole.
+
+PAGE_SIZES=[10,25,50,100]
+NONE="(none)"
+
+
+def _text(col):
+    return col.astype(object).where(col.notna(),"").astype(str)
+
+
+def _sorted(df,col,descending):
+    try:
+        return df.sort_values(col,ascending=not descending,kind="stable")
+    except TypeError:
+        # mixed numbers and text: fall back to text order
+        return df.sort_values(col,ascending=not descending,kind="stable",key=_text)
+
+
+def paged_table(df,key,page_size=25):
+    total=len(df)
+    if total<=PAGE_SIZES[0]:
+        perf.dataframe(df)
+        return df
+
+    view=df
+    with st.expander("Sort & filter"):
+        c1,c2=st.columns(2)
+        fcol=c1.selectbox("Filter column",[NONE]+list(df.columns),key=f"{key}_fcol")
+        ftext=c2.text_input("Contains",key=f"{key}_ftext")
+        scol=c1.selectbox("Sort by",[NONE]+list(df.columns),key=f"{key}_scol")
+        desc=c2.checkbox("Descending",key=f"{key}_desc")
+
+    if fcol!=NONE and ftext:
+        view=view[_text(view[fcol]).str.contains(ftext,case=False,regex=False)]
+    if scol!=NONE:
+        view=_sorted(view,scol,desc)
+
+    c1,c2=st.columns(2)
+    size=c1.selectbox("Rows per page",PAGE_SIZES,index=PAGE_SIZES.index(page_size),key=f"{key}_size")
+    pages=max(1,math.ceil(len(view)/size))
+    if st.session_state.get(f"{key}_page",1)>pages:
+        st.session_state[f"{key}_page"]=1
+    page=c2.number_input("Page",min_value=1,max_value=pages,key=f"{key}_page")
+
+    start=(page-1)*size
+    st.caption(f"{len(view)} of {total} rows · page {page} of {pages}")
+    perf.dataframe(view.iloc[start:start+size])
+    return view
@@ -0,0 +1,163 @@
+import cProfile
+import functools
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager,nullcontext
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+import data_cache
+
+
+# ---------------- RERUN PROFILING ----------------
+# Opt-in breakdown of each script rerun. Set VILLAGE_PROFILE=1 to record,
+# or VILLAGE_PROFILE=cprofile to also keep a cProfile dump of the slowest
+# rerun. app.py calls begin() at the top and end() at the bottom; stage()
+# blocks in between add their time to the current rerun, sent() the bytes
+# handed to the browser. Finished reruns go to a ring buffer shared by all
+# sessions, summarized on the Performance page.
+# Fragment reruns (st.fragment) skip begin()/end(); track() records them as
+# entries of their own, named after the fragment.
+# Off by default: stage() then returns one shared no-op context.
+
+MODE=os.environ.get("VILLAGE_PROFILE","").lower()
+ENABLED=MODE not in ("","0","false","off")
+PROFILE=MODE=="cprofile"
+KEEP=500
+
+_lock=threading.Lock()
+_local=threading.local()   # Streamlit runs each rerun on one script thread
+_noop=nullcontext()
+runs=deque(maxlen=KEEP)
+slowest={"ms":0.0,"page":None,"path":None}
+
+
+def begin():
+    left=getattr(_local,"run",None)
+    if left and "profile" in left:
+        left["profile"].disable()   # previous rerun ended in st.stop/st.rerun
+    _local.run=None
+    if not ENABLED:
+        return
+    run={"stages":{},"bytes":0,"cache":dict(data_cache.stats),"start":time.perf_counter()}
+    if PROFILE:
+        profile=cProfile.Profile()
+        try:
+            profile.enable()
+            run["profile"]=profile
+        except ValueError:
+            pass   # another session's rerun is being profiled (3.12+)
+    _local.run=run
+
+
+@contextmanager
+def _timed(run,name):
+    start=time.perf_counter()
+    try:
+        yield
+    finally:
+        run["stages"][name]=run["stages"].get(name,0.0)+(time.perf_counter()-start)*1000
+
+
+def stage(name):
+    run=getattr(_local,"run",None)
+    return _timed(run,name) if run else _noop
+
+
+def sent(nbytes):
+    run=getattr(_local,"run",None)
+    if run:
+        run["bytes"]+=nbytes
+
+
+def frame_bytes(df):
+    try:
+        return pa.Table.from_pandas(df).nbytes
+    except (pa.ArrowException,TypeError,ValueError):
+        return int(df.memory_usage(deep=True).sum())
+
+
+def dataframe(df):
+    with stage("dataframe"):
+        st.dataframe(df)
+    if getattr(_local,"run",None):
+        sent(frame_bytes(df))
+
+
+def end(page=None):
+    run=getattr(_local,"run",None)
+    _local.run=None
+    if not run:
+        return
+    total=(time.perf_counter()-run["start"])*1000
+    record={
+        "at":time.strftime("%H:%M:%S"),
+        "page":page,
+        "total":total,
+        "stages":run["stages"],
+        "bytes":run["bytes"],
+        **{k:data_cache.stats[k]-v for k,v in run["cache"].items()},
+    }
+    with _lock:
+        runs.append(record)
+
+    if "profile" in run:
+        run["profile"].disable()
+        with _lock:
+            if total<=slowest["ms"]:
+                return
+            path=slowest["path"] or os.path.join(tempfile.gettempdir(),f"village_slowest_{os.getpid()}.prof")
+            run["profile"].dump_stats(path)
+            slowest.update(ms=total,page=page,path=path)
+
+
+def track(name):
+    # a fragment: a stage of the full rerun that calls it, or on its own
+    # fragment rerun, a recorded run of its own
+    def wrap(f):
+        @functools.wraps(f)
+        def run(*args,**kwargs):
+            if getattr(_local,"run",None):
+                with stage(name):
+                    return f(*args,**kwargs)
+            begin()
+            try:
+                return f(*args,**kwargs)
+            finally:
+                end(name)
+        return run
+    return wrap
+
+
+def clear():
+    with _lock:
+        runs.clear()
+        slowest.update(ms=0.0,page=None)
+
+
+# ---------------- SUMMARY ----------------
+def summary():
+    with _lock:
+        recent=list(runs)
+    rows=[]
+    for name in ["total"]+sorted({s for r in recent for s in r["stages"]}):
+        ms=np.array([r["total"] if name=="total" else r["stages"][name] for r in recent
+                     if name=="total" or name in r["stages"]])
+        if len(ms):
+            rows.append({"Stage":name,"Reruns":len(ms),"p50 ms":np.percentile(ms,50),
+                         "p95 ms":np.percentile(ms,95),"Max ms":ms.max()})
+    return pd.DataFrame(rows,columns=["Stage","Reruns","p50 ms","p95 ms","Max ms"]).round(2)
+
+
+def recent(n=20):
+    with _lock:
+        last=list(runs)[-n:]
+    return pd.DataFrame([{"At":r["at"],"Page":r["page"],"Total ms":round(r["total"],1),
+                          "Cache hits":r["hits"],"Cache misses":r["misses"],"Bytes":r["bytes"]}
+                         for r in reversed(last)])
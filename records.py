@@ -0,0 +1,91 @@
+import pandas as pd
+import streamlit as st
+
+from key_index import RecordIndex,key_text
+from search_index import SearchIndex
+
+
+# ---------------- RECORD ADDRESSING ----------------
+# Admin edits address a record by its stable row id (the journal id for CSV
+# tables, the _id column in SQLite), written "#12" - never by its position in
+# the table, which shifts whenever another admin adds or deletes a row.
+# A record is found by its natural key (PRIMARY) through a RecordIndex, by
+# "#id", or by text search. An edit is saved only if the record still holds
+# what the admin was shown, and a new or changed natural key must not
+# already belong to another record.
+
+PRIMARY={"families":"Family_ID","pupils":"Voter_ID"}
+SHOWN=50
+
+
+def key_index(store,name):
+    column=PRIMARY[name]
+    return store.derived(name,f"key:{column}",lambda df:RecordIndex(df,column))
+
+
+def locate(store,df,name,query):
+    q=str(query).strip()
+    if q.startswith("#") and q[1:].isdigit():
+        return [int(q[1:])] if int(q[1:]) in df.index else []
+    if name in PRIMARY:
+        ids=[i for i in key_index(store,name).rows(q) if i in df.index]
+        if ids:
+            return ids
+    return store.derived(name,"search",SearchIndex).rows(q.lower()).index.intersection(df.index).tolist()
+
+
+def describe(df,ids,width=3):
+    cols=list(df.columns[:width])
+    return {i:" · ".join([f"#{i}"]+["" if pd.isna(v) else str(v) for v in df.loc[i,cols]]) for i in ids}
+
+
+def values(row):
+    return {c:"" if pd.isna(v) else str(v) for c,v in row.items()}
+
+
+# ---------------- CHECKS ----------------
+# each returns a message for st.error, or None when the write may go ahead
+def stale(before,key,row):
+    if before is None or before[0]!=key:
+        return "Pick the record again before saving"
+    if before[1]!=values(row):
+        return f"Record #{key} was changed by someone else since it was shown; check it and save again"
+    return None
+
+
+def taken(store,name,new,key=None,old=None):
+    column=PRIMARY.get(name)
+    if column not in new or not str(new[column]).strip():
+        return None
+    if old is not None and key_text([new[column]]).iat[0]==key_text([old[column]]).iat[0]:
+        return None   # unchanged: duplicates already in the table are not the admin's doing
+    others=[i for i in key_index(store,name).rows(new[column]) if i!=key]
+    if others:
+        return f"{column} {str(new[column]).strip()} already belongs to record #{others[0]}"
+    return None
+
+
+# ---------------- PICKER ----------------
+def pick(store,df,name,title,action):
+    column=PRIMARY.get(name)
+    hint=f"{column}, " if column else ""
+    query=st.text_input(f"Find a record ({hint}#row id or any text)",key=f"{title}_{action}_find")
+    if not query.strip():
+        return None
+    ids=locate(store,df,name,query)
+    if not ids:
+        st.warning("No matching record")
+        return None
+    if len(ids)>SHOWN:
+        st.caption(f"{len(ids)} matches, showing the first {SHOWN}; narrow the search")
+        ids=ids[:SHOWN]
+    labels=describe(df,[int(i) for i in ids])
+    return st.selectbox("Record",list(labels),format_func=labels.get,key=f"{title}_{action}_record")
+
+
+def remember(title,action,key,row):
+    # what this run showed; returns what the previous run showed
+    slot=f"{title}_{action}_shown"
+    before=st.session_state.get(slot)
+    st.session_state[slot]=(key,values(row))
+    return before
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+
+# ---------------- TABLE SCHEMAS ----------------
+# Column lists the portal creates each table with (see ensure_file). Extra
+# columns already present in a CSV are kept alongside these.
+
+SCHEMAS={
+    "families":["Family_ID","Head_of_Family","Address"],
+    "pupils":["Name","Family_ID","Relation","Age","Voter_ID"],
+    "places":["Name","Type","Latitude","Longitude"],
+    "team":["Name","Role"],
+    "leagues":["Sport","Season","Winner","Runner"],
+    "ward_ranges":["Ward","Start","End"],
+    "youth":["Youth_Name","President","Members","Logo"],
+}
+
+# columns stored as numbers; everything else is text
+NUMERIC={"Age","Ward","Start","End","Latitude","Longitude"}
+
+# columns worth an index wherever a table has them
+INDEXED=["Family_ID","Voter_ID","Name"]
+
+
+# ---------------- COMPACT DTYPES ----------------
+# Tables are held with explicit dtypes instead of whatever read_csv guessed:
+# categoricals for the few-valued columns, floats for coordinates, nullable
+# ints for counts and voter/ward numbers (so 222 stays 222, not 222.0) and
+# Arrow-backed strings for the rest of the text. A column only changes type
+# if nothing is lost; a Voter_ID column holding "ABC991" stays text (222.0
+# still becomes "222").
+
+CATEGORY={"Relation","Type","Role","Sport","Season"}
+INTEGER={"Age":"Int32","Ward":"Int32","Voter_ID":"Int64","Start":"Int64","End":"Int64"}
+NUMBER={**{c:"float64" for c in NUMERIC},**INTEGER}
+
+try:
+    STRING=pd.StringDtype("pyarrow",na_value=np.nan)   # pandas' "str": NaN for missing
+except TypeError:
+    STRING=pd.StringDtype("pyarrow")
+
+
+def _number(col,dtype):
+    num=pd.to_numeric(col,errors="coerce")
+    if num.notna().sum()!=col.notna().sum():
+        return None
+    if dtype!="float64" and (num.dropna()%1!=0).any():
+        return None
+    return num.astype(dtype)
+
+
+def typed(df):
+    out={}
+    for c in df.columns:
+        col=df[c]
+        if c in NUMBER:
+            num=_number(col,NUMBER[c])
+            if num is not None:
+                out[c]=num
+                continue
+        if c in INTEGER:
+            # mixed ids: keep text, without the float tail on the numbers
+            out[c]=col.astype(STRING).str.replace(r"^(\d+)\.0$",r"\1",regex=True)
+            continue
+        if c in CATEGORY:
+            out[c]=col.astype("category")
+        elif col.dtype==object or pd.api.types.is_string_dtype(col.dtype):
+            out[c]=col.astype(STRING)
+    typed_df=df.assign(**out) if out else df
+    typed_df.attrs=df.attrs
+    return typed_df
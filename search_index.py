@@ -0,0 +1,223 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from schema import STRING
+
+
+# ---------------- TRIGRAM INVERTED INDEX ----------------
+# Every row of a table is flattened into one lowercase string (cells joined
+# by SEP, so a match can never span two cells). Each trigram of that string
+# points at the rows containing it. A query is answered by intersecting the
+# posting lists of its trigrams and confirming the few survivors with a
+# plain substring check, instead of scanning every cell of every row.
+# The row strings are kept as one Arrow string column, not a lowercased copy
+# of the whole table.
+#
+# An index keeps the frame it was built from and returns rows of that
+# frame, so hits always line up with the rows they were computed on, even
+# when the caller still holds a frame from before another session's write.
+#
+# Recent results are kept in a small LRU per index. An index belongs to one
+# data version (store.derived), so entries are effectively keyed by
+# (version, lowercased query) and are shared by all sessions. A query that
+# extends a cached one ("guds" after "gud") only re-checks that one's hits,
+# so each keystroke costs the previous hit count, not the table size.
+
+SEP="\x1f"
+GRAM=3
+RECENT=64
+
+
+def row_text(df):
+    if df.empty:
+        return []
+    cells=df.astype(object).where(df.notna(),"").astype(str)
+    first,rest=cells.iloc[:,0],[cells.iloc[:,i] for i in range(1,cells.shape[1])]
+    return first.str.cat(rest,sep=SEP).str.lower().tolist()
+
+
+def trigrams(text):
+    return {text[i:i+GRAM] for i in range(len(text)-GRAM+1)}
+
+
+class SearchIndex:
+
+    def __init__(self,df):
+        self.df=df
+        rows=row_text(df)
+        postings={}
+        for i,text in enumerate(rows):
+            for g in trigrams(text):
+                if SEP not in g:
+                    postings.setdefault(g,[]).append(i)
+        self.postings={g:np.array(ids,dtype=np.int32) for g,ids in postings.items()}
+        self.text=pd.Series(rows,dtype=STRING)
+        self.recent=OrderedDict()
+        self._lock=threading.Lock()
+
+    def __len__(self):
+        return len(self.text)
+
+    def nbytes(self):
+        return int(self.text.memory_usage(deep=True))+sum(ids.nbytes for ids in self.postings.values())
+
+    def candidates(self,q):
+        lists=[]
+        for g in trigrams(q):
+            ids=self.postings.get(g)
+            if ids is None:
+                return np.empty(0,dtype=np.int32)
+            lists.append(ids)
+        lists.sort(key=len)
+        hits=lists[0]
+        for ids in lists[1:]:
+            hits=np.intersect1d(hits,ids,assume_unique=True)
+            if len(hits)==0:
+                break
+        return hits
+
+    def refine(self,hits,q):
+        if len(hits)==0:
+            return hits
+        return hits[self.text.iloc[hits].str.contains(q,regex=False).to_numpy(dtype=bool)]
+
+    def _search(self,q):
+        # too short for a trigram: a scan over the flat row strings
+        if len(q)<GRAM:
+            return np.flatnonzero(self.text.str.contains(q,regex=False).to_numpy(dtype=bool))
+
+        hits=self.candidates(q)
+        if len(q)==GRAM:
+            return hits
+        return self.refine(hits,q)
+
+    def _extend(self,base,q):
+        if len(q)<GRAM:
+            return self.refine(base,q)
+        # re-check the earlier hits, unless q's rarest trigram narrows further
+        rarest=min((len(self.postings.get(g,())) for g in trigrams(q)),default=0)
+        if len(base)<=rarest:
+            return self.refine(base,q)
+        hits=self.candidates(q)
+        hits=np.intersect1d(hits,base,assume_unique=True) if len(hits) else hits
+        return hits if len(q)==GRAM else self.refine(hits,q)
+
+    def search(self,query):
+        q=str(query).lower()
+        if not q or SEP in q:
+            return np.empty(0,dtype=np.int64)
+
+        with self._lock:
+            hits=self.recent.get(q)
+            if hits is not None:
+                self.recent.move_to_end(q)
+                return hits
+            # longest cached query this one extends
+            prefix=next((q[:i] for i in range(len(q)-1,0,-1) if q[:i] in self.recent),None)
+            base=self.recent.get(prefix) if prefix else None
+
+        hits=self._search(q) if base is None else self._extend(base,q)
+        hits.flags.writeable=False   # shared by every session reading the cache
+        with self._lock:
+            self.recent[q]=hits
+            self.recent.move_to_end(q)
+            if len(self.recent)>RECENT:
+                self.recent.popitem(last=False)
+        return hits
+
+    def rows(self,query):
+        return self.df.iloc[self.search(query)]
+
+
+# ---------------- FUZZY NAME INDEX ----------------
+# Typo-tolerant lookup on name columns ("GUDISHE" finds GUDISE,
+# "SECRETRY" finds SECERATREY). Names are split into words; the distinct
+# words (far fewer than rows) get a trigram index and a phonetic key that
+# folds common transliteration differences (sh/s, th/t, ee/i, vowels).
+# A query word is compared only with words sharing a trigram or its key,
+# and only rows holding those words are scored: each row gets the mean,
+# over the query words, of its best word similarity. Top k come back, best
+# first.
+
+TOP_K=20
+MIN_SIMILARITY=0.3
+PHONETIC_SIMILARITY=0.8
+FOLDS=[("ow","ou"),("sh","s"),("th","t"),("dh","d"),("kh","k"),("gh","g"),("bh","b"),("ph","f"),
+       ("ch","c"),("ee","i"),("oo","u"),("w","v"),("z","j"),("q","k"),("x","ks")]
+
+
+def words(text):
+    return "".join(c if c.isalpha() else " " for c in str(text).lower()).split()
+
+
+def word_grams(word):
+    return trigrams(f"  {word} ")
+
+
+def phonetic(word):
+    for a,b in FOLDS:
+        word=word.replace(a,b)
+    key=word[:1]+"".join(c for c in word[1:] if c not in "aeiouy")
+    return "".join(c for i,c in enumerate(key) if i==0 or c!=key[i-1])
+
+
+class FuzzyIndex:
+
+    def __init__(self,df,columns):
+        self.df=df
+        vocab,word_rows={},[]
+        cols=[c for c in ([columns] if isinstance(columns,str) else columns) if c in df]
+        names=row_text(df[cols]) if cols else []
+        for pos,name in enumerate(names):
+            for w in set(words(name)):
+                if w not in vocab:
+                    vocab[w]=len(word_rows)
+                    word_rows.append([])
+                word_rows[vocab[w]].append(pos)
+        self.words=list(vocab)
+        self.word_rows=[np.array(r,dtype=np.int32) for r in word_rows]
+
+        grams,keys={},{}
+        for i,w in enumerate(self.words):
+            for g in word_grams(w):
+                grams.setdefault(g,[]).append(i)
+            keys.setdefault(phonetic(w),[]).append(i)
+        self.grams={g:np.array(ids,dtype=np.int32) for g,ids in grams.items()}
+        self.keys=keys
+        self.gram_counts=np.array([len(word_grams(w)) for w in self.words],dtype=np.int32)
+
+    def similar_words(self,word):
+        grams=word_grams(word)
+        lists=[self.grams[g] for g in grams if g in self.grams]
+        scores={}
+        if lists:
+            ids,shared=np.unique(np.concatenate(lists),return_counts=True)
+            jaccard=shared/(len(grams)+self.gram_counts[ids]-shared)
+            keep=jaccard>=MIN_SIMILARITY
+            scores=dict(zip(ids[keep].tolist(),jaccard[keep].tolist()))
+        for i in self.keys.get(phonetic(word),[]):
+            scores[i]=max(scores.get(i,0.0),PHONETIC_SIMILARITY)
+        return scores
+
+    def search(self,query,k=TOP_K):
+        qwords=words(query)
+        if not qwords or not self.words:
+            return np.empty(0,dtype=np.int64),np.empty(0)
+        parts=[]
+        for qi,w in enumerate(qwords):
+            for i,score in self.similar_words(w).items():
+                parts.append(pd.DataFrame({"row":self.word_rows[i],"word":qi,"score":score}))
+        if not parts:
+            return np.empty(0,dtype=np.int64),np.empty(0)
+        hits=pd.concat(parts,ignore_index=True)
+        best=hits.groupby(["row","word"],sort=False)["score"].max()
+        total=best.groupby(level="row",sort=False).sum()/len(qwords)
+        top=total.sort_values(ascending=False,kind="stable").head(k)
+        return top.index.to_numpy(dtype=np.int64),top.to_numpy()
+
+    def rows(self,query,k=TOP_K):
+        pos,scores=self.search(query,k)
+        return self.df.iloc[pos].assign(Match=np.round(scores,2))
@@ -1,5 +1,132 @@
-self.addEventListener("install", (event) => {
-  self.skipWaiting();
-});
-
-self.addEventListener("fetch", (event) => {});
\ No newline at end of file
+// ---------------- OFFLINE CACHING ----------------
+// App shell (page, manifest, icons) is precached on install. Streamlit's
+// hashed bundles, /assets and /media never change under the same URL, so
+// they come from the cache first. /api/ data (api.py, proxied on the same
+// origin) is stale-while-revalidate: the cached copy answers at once and is
+// revalidated with its ETag, so an unchanged table costs an empty 304.
+// Data caches are named after /api/version: when the data changes, the old
+// cache is dropped. Bump SHELL_VERSION when the shell files change.
+
+const SHELL_VERSION = "v1";
+const SHELL_CACHE = `village-shell-${SHELL_VERSION}`;
+const STATIC_CACHE = `village-static-${SHELL_VERSION}`;
+const DATA_PREFIX = "village-data-";
+const SHELL = ["/", "/manifest.json", "/assets/icon-192.png", "/assets/icon-512.png"];
+const MAX_STATIC = 200;
+const MAX_DATA = 100;
+const VERSION_CHECK_MS = 60 * 1000;
+
+let dataVersion = null;
+let versionChecked = 0;
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(SHELL_CACHE).then((cache) => cache.addAll(SHELL)).then(() => self.skipWaiting())
+  );
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then((names) => Promise.all(names
+        .filter((name) => name.startsWith("village-") && !name.startsWith(DATA_PREFIX))
+        .filter((name) => name !== SHELL_CACHE && name !== STATIC_CACHE)
+        .map((name) => caches.delete(name))))
+      .then(() => self.clients.claim())
+  );
+});
+
+// ---------------- EVICTION ----------------
+// oldest entries first, once a cache holds more than its limit
+async function trim(cache, limit) {
+  const keys = await cache.keys();
+  await Promise.all(keys.slice(0, Math.max(0, keys.length - limit)).map((key) => cache.delete(key)));
+}
+
+// the cache for the current data version, checked at most once a minute
+async function dataCache() {
+  const now = Date.now();
+  if (!dataVersion || now - versionChecked > VERSION_CHECK_MS) {
+    versionChecked = now;
+    let fresh = null;
+    try {
+      const res = await fetch("/api/version", { cache: "no-cache" });
+      if (res.ok) fresh = (await res.json()).version;
+    } catch (e) {}
+    const names = (await caches.keys()).filter((name) => name.startsWith(DATA_PREFIX));
+    if (fresh) {
+      dataVersion = fresh;
+      await Promise.all(names.filter((name) => name !== DATA_PREFIX + fresh).map((name) => caches.delete(name)));
+    } else if (!dataVersion) {
+      // offline on first use: keep serving whatever was cached last
+      dataVersion = names.length ? names[names.length - 1].slice(DATA_PREFIX.length) : "offline";
+    }
+  }
+  return caches.open(DATA_PREFIX + dataVersion);
+}
+
+// ---------------- STRATEGIES ----------------
+async function cacheFirst(request, cacheName, limit) {
+  const cache = await caches.open(cacheName);
+  const cached = await cache.match(request);
+  if (cached) return cached;
+  const res = await fetch(request);
+  if (res.ok) {
+    await cache.put(request, res.clone());
+    await trim(cache, limit);
+  }
+  return res;
+}
+
+async function staleWhileRevalidate(event) {
+  const request = event.request;
+  const cache = await dataCache();
+  const cached = await cache.match(request);
+  const etag = cached && cached.headers.get("ETag");
+  const network = fetch(etag ? new Request(request, { headers: { "If-None-Match": etag } }) : request)
+    .then(async (res) => {
+      if (res.status === 304) return cached;
+      if (res.ok) {
+        await cache.put(request, res.clone());
+        await trim(cache, MAX_DATA);
+      }
+      return res;
+    })
+    .catch(() => cached || Response.error());
+  if (cached) {
+    event.waitUntil(network);
+    return cached;
+  }
+  return network;
+}
+
+async function networkFirst(request) {
+  try {
+    const res = await fetch(request);
+    if (res.ok) {
+      const cache = await caches.open(SHELL_CACHE);
+      await cache.put("/", res.clone());
+    }
+    return res;
+  } catch (e) {
+    return (await caches.match("/")) || Response.error();
+  }
+}
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== "GET" || url.origin !== self.location.origin) return;
+  // Streamlit's own endpoints (session, health, uploads) always go to the server
+  if (url.pathname.startsWith("/_stcore/")) return;
+
+  if (request.mode === "navigate") {
+    event.respondWith(networkFirst(request));
+  } else if (url.pathname.startsWith("/api/")) {
+    event.respondWith(staleWhileRevalidate(event));
+  } else if (SHELL.includes(url.pathname)) {
+    event.respondWith(caches.match(request).then((cached) => cached || fetch(request)));
+  } else if (/^\/(static|assets|media)\//.test(url.pathname)) {
+    event.respondWith(cacheFirst(request, STATIC_CACHE, MAX_STATIC));
+  }
+});
@@ -0,0 +1,63 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+import data_cache
+
+
+# ---------------- COLUMNAR SNAPSHOTS ----------------
+# CSV stays the file people edit; <table>.arrow next to it is a derived,
+# uncompressed Arrow IPC copy that loads by memory-map instead of parsing
+# text. The snapshot records the (mtime, size) of the CSV it was made from
+# and is only used while the CSV still matches; otherwise the CSV is parsed
+# and the snapshot rewritten. Deleting a snapshot is always safe.
+
+KEY=b"csv_version"
+
+
+def snapshot_path(csv_path):
+    return Path(csv_path).with_suffix(".arrow")
+
+
+def _stamp(v):
+    return f"{v[0]},{v[1]}".encode()
+
+
+def _load(path,stamp):
+    try:
+        with pa.memory_map(str(path)) as source:
+            reader=pa.ipc.open_file(source)
+            if (reader.schema.metadata or {}).get(KEY)!=stamp:
+                return None
+            return reader.read_all().to_pandas()
+    except (OSError,pa.ArrowException):
+        return None
+
+
+def _write(path,df,stamp):
+    table=pa.Table.from_pandas(df,preserve_index=False)
+    table=table.replace_schema_metadata({**(table.schema.metadata or {}),KEY:stamp})
+    tmp=path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp),"wb") as sink:
+        with pa.ipc.new_file(sink,table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp,path)
+
+
+def read_csv(csv_path):
+    v=data_cache.version(csv_path)
+    if v is None:
+        return pd.DataFrame()
+    path=snapshot_path(csv_path)
+    df=_load(path,_stamp(v))
+    if df is not None:
+        return df
+
+    df=pd.read_csv(csv_path)
+    try:
+        _write(path,df,_stamp(v))
+    except (OSError,pa.ArrowException,TypeError,ValueError):
+        pass   # columns Arrow cannot hold: keep parsing the CSV
+    return df
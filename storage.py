@@ -0,0 +1,268 @@
+import functools
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+from journal import Journal
+from key_index import KeyIndex
+from schema import SCHEMAS,NUMERIC,INDEXED,typed
+
+
+# ---------------- STORAGE BACKENDS ----------------
+# Both backends expose the same table API (ensure/read/derived/find/add/
+# add_many/update/delete/orphaned). Rows are addressed by the index label of
+# the frame that read() returned: the journal row id for CSV (see journal.py),
+# the _id column otherwise. Neither is ever handed out twice. Frames come back with the compact dtypes of
+# schema.typed().
+# Set VILLAGE_DB to a database file (see migrate below) to use SQLite.
+
+def quote(name):
+    return '"'+str(name).replace('"','""')+'"'
+
+
+def _value(v):
+    if isinstance(v,np.generic):
+        v=v.item()
+    if v is None or v is pd.NA or v=="" or (isinstance(v,float) and np.isnan(v)):
+        return None
+    return v
+
+
+# ---------------- CSV ----------------
+class CsvStorage:
+
+    def __init__(self,base_dir):
+        self.base_dir=Path(base_dir)
+        self.journals={}
+
+    def path(self,name):
+        return self.base_dir/f"{name}.csv"
+
+    def journal(self,name):
+        if name not in self.journals:
+            self.journals[name]=Journal(self.path(name))
+        return self.journals[name]
+
+    def version(self,name):
+        j=self.journal(name)
+        return data_cache.version(j.csv_path),data_cache.version(j.path)
+
+    def ensure(self,name,cols):
+        path=self.path(name)
+        if not path.exists():
+            pd.DataFrame(columns=cols).to_csv(path,index=False)
+        self.journal(name).settle()
+
+    def orphaned(self,name):
+        return self.journal(name).orphaned()
+
+    def _read(self,name):
+        return typed(self.journal(name).read())
+
+    def read(self,name):
+        return data_cache.table(self.path(name),self.version(name),lambda:self._read(name))
+
+    def derived(self,name,key,build):
+        return data_cache.derived(self.path(name),key,build,self.version(name),lambda:self._read(name))
+
+    def find(self,name,column,value):
+        return self.derived(name,f"by:{column}",lambda df:KeyIndex(df,column)).rows(value)
+
+    def add(self,name,row):
+        self._append(name,{"op":"add","row":{c:_value(v) for c,v in row.items()}})
+
+    def update(self,name,key,row):
+        self._append(name,{"op":"update","id":key,"row":{c:_value(v) for c,v in row.items()}})
+
+    def delete(self,name,key):
+        self._append(name,{"op":"delete","id":key})
+
+    def add_many(self,name,rows):
+        self.journal(name).extend([{c:_value(v) for c,v in row.items()} for row in rows])
+        data_cache.invalidate(self.path(name))
+
+    def _append(self,name,op):
+        self.journal(name).append(op)
+        data_cache.invalidate(self.path(name))
+
+
+# ---------------- SQLITE ----------------
+BUMP="INSERT INTO _versions VALUES (?,1) ON CONFLICT(name) DO UPDATE SET version=version+1"
+# AUTOINCREMENT: a plain rowid is reused once the last row is deleted
+ID="_id"
+
+
+def _create(conn,name,cols):
+    defs=",".join([f"{quote(ID)} INTEGER PRIMARY KEY AUTOINCREMENT"]+
+                  [f"{quote(c)} {'NUMERIC' if c in NUMERIC else 'TEXT'}" for c in cols])
+    conn.execute(f"CREATE TABLE {quote(name)} ({defs})")
+
+
+def create_table(conn,name,cols):
+    have=[r[1] for r in conn.execute(f"PRAGMA table_info({quote(name)})")]
+    if not have:
+        _create(conn,name,cols)
+    elif ID not in have:
+        # made before rows had an id column: their rowids become the ids
+        old=quote(f"{name}_old")
+        listed=",".join(quote(c) for c in have)
+        conn.execute(f"ALTER TABLE {quote(name)} RENAME TO {old}")
+        _create(conn,name,have)
+        conn.execute(f"INSERT INTO {quote(name)} ({quote(ID)},{listed}) SELECT rowid,{listed} FROM {old}")
+        conn.execute(f"DROP TABLE {old}")
+    for c in INDEXED:
+        if c in cols:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {quote(f'idx_{name}_{c}')} ON {quote(name)} ({quote(c)})")
+
+
+class SqliteStorage:
+
+    def __init__(self,db_path,base_dir):
+        self.db_path=str(db_path)
+        # tables outside SCHEMAS (gallery, media...) stay in CSV
+        self.csv=CsvStorage(base_dir)
+        self._local=threading.local()
+
+    def connect(self):
+        conn=getattr(self._local,"conn",None)
+        if conn is None:
+            conn=sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS _versions (name TEXT PRIMARY KEY, version INTEGER)")
+            self._local.conn=conn
+        return conn
+
+    def key(self,name):
+        return f"{self.db_path}#{name}"
+
+    def version(self,name):
+        if name not in SCHEMAS:
+            return self.csv.version(name)
+        row=self.connect().execute("SELECT version FROM _versions WHERE name=?",(name,)).fetchone()
+        return row[0] if row else 0
+
+    def ensure(self,name,cols):
+        if name not in SCHEMAS:
+            return self.csv.ensure(name,cols)
+        with self.connect() as conn:
+            create_table(conn,name,cols)
+
+    def orphaned(self,name):
+        return [] if name in SCHEMAS else self.csv.orphaned(name)
+
+    def query(self,sql,params=()):
+        df=pd.read_sql_query(sql,self.connect(),params=params,index_col=ID)
+        df.index.name=None
+        return typed(df)
+
+    def _read(self,name):
+        return self.query(f"SELECT * FROM {quote(name)}")
+
+    def read(self,name):
+        if name not in SCHEMAS:
+            return self.csv.read(name)
+        return data_cache.table(self.key(name),self.version(name),lambda:self._read(name))
+
+    def derived(self,name,key,build):
+        if name not in SCHEMAS:
+            return self.csv.derived(name,key,build)
+        return data_cache.derived(self.key(name),key,build,self.version(name),lambda:self._read(name))
+
+    def find(self,name,column,value):
+        if name not in SCHEMAS:
+            return self.csv.find(name,column,value)
+        return self.query(f"SELECT * FROM {quote(name)} WHERE {quote(column)}=?",(_value(value),))
+
+    def add(self,name,row):
+        if name not in SCHEMAS:
+            return self.csv.add(name,row)
+        cols=",".join(quote(c) for c in row)
+        marks=",".join("?"*len(row))
+        self._execute(name,f"INSERT INTO {quote(name)} ({cols}) VALUES ({marks})",[_value(v) for v in row.values()])
+
+    def update(self,name,key,row):
+        if name not in SCHEMAS:
+            return self.csv.update(name,key,row)
+        sets=",".join(f"{quote(c)}=?" for c in row)
+        self._execute(name,f"UPDATE {quote(name)} SET {sets} WHERE {quote(ID)}=?",[_value(v) for v in row.values()]+[_value(key)])
+
+    def delete(self,name,key):
+        if name not in SCHEMAS:
+            return self.csv.delete(name,key)
+        self._execute(name,f"DELETE FROM {quote(name)} WHERE {quote(ID)}=?",[_value(key)])
+
+    def add_many(self,name,rows):
+        if name not in SCHEMAS:
+            return self.csv.add_many(name,rows)
+        if not rows:
+            return
+        cols=list(dict.fromkeys(c for row in rows for c in row))
+        marks=",".join("?"*len(cols))
+        self._execute(name,f"INSERT INTO {quote(name)} ({','.join(quote(c) for c in cols)}) VALUES ({marks})",
+                      [[_value(row.get(c)) for c in cols] for row in rows],many=True)
+
+    def _execute(self,name,sql,params,many=False):
+        conn=self.connect()
+        with conn:
+            if many:
+                conn.executemany(sql,params)
+            else:
+                conn.execute(sql,params)
+            conn.execute(BUMP,(name,))
+        data_cache.invalidate(self.key(name))
+
+
+# ---------------- BACKEND SELECTION ----------------
+@functools.lru_cache(maxsize=None)
+def _backend(base_dir,db):
+    if db:
+        return SqliteStorage(Path(base_dir)/db,base_dir)
+    return CsvStorage(base_dir)
+
+
+def backend(base_dir):
+    return _backend(str(base_dir),os.environ.get("VILLAGE_DB"))
+
+
+# ---------------- CSV -> SQLITE MIGRATION ----------------
+# tables are read the way CsvStorage serves them: journal replayed and
+# typed, so 222.0 goes in as 222 and rows keep their ids
+def migrate(base_dir,db_path):
+    base_dir=Path(base_dir)
+    source=CsvStorage(base_dir)
+    store=SqliteStorage(db_path,base_dir)
+    conn=store.connect()
+    counts={}
+    for name,cols in SCHEMAS.items():
+        df=source.read(name) if source.path(name).exists() else pd.DataFrame(columns=cols)
+        next_id=df.attrs.get("next_id",len(df))
+        cols=cols+[c for c in df.columns if c not in cols]
+        df=df.reindex(columns=cols)
+
+        marks=",".join("?"*(len(cols)+1))
+        listed=",".join(quote(c) for c in [ID]+cols)
+        with conn:
+            conn.execute(f"DROP TABLE IF EXISTS {quote(name)}")
+            create_table(conn,name,cols)
+            conn.executemany(f"INSERT INTO {quote(name)} ({listed}) VALUES ({marks})",
+                             ([_value(v) for v in row] for row in df.itertuples(index=True)))
+            # ids the journal already handed out are not handed out again
+            conn.execute("DELETE FROM sqlite_sequence WHERE name=?",(name,))
+            conn.execute("INSERT INTO sqlite_sequence VALUES (?,?)",(name,next_id-1))
+            conn.execute(BUMP,(name,))
+        counts[name]=len(df)
+    return counts
+
+
+if __name__=="__main__":
+    base=Path(__file__).parent
+    db=sys.argv[1] if len(sys.argv)>1 else "village.db"
+    for name,n in migrate(base,base/db).items():
+        print(f"{name}: {n} rows")
@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from schema import SCHEMAS
+
+
+# ---------------- SYNTHETIC VILLAGE ----------------
+# Seeded, realistic-looking tables for benchmarks: n pupils spread over n/4
+# households, wards of WARD_SIZE voters covering the voter roll, a place
+# per ten households. Same seed and size, same files. Built with numpy so a
+# million-row roll takes seconds, not minutes.
+#
+#   python synthetic.py bench_data 100000
+
+SURNAMES=["GUDISE","LANKA","KOTHURI","MALYALA","NALGONDA","GUMMADI","BUTHUKURI","ADI"]
+NAMES=["MANGA","ANJI","BALAVVA","VENKATESH","SAI KRISHNA","SOUMYA","HARIKA","MAHI TEJA",
+       "SUJATHA","PREM KUMAR","RAJITHA","NITHIN","JYOTHI","ANUSHA","KOUSHIK","ASWITHA"]
+RELATIONS=["WIFE","SON","DAUGHTER","MOTHER","DAUGHTER IN LAW"]
+STREETS=["Main Road","Temple Street","School Street","Tank Bund","Market Road"]
+PLACE_TYPES=["Office","School","Temple","Shop","Hospital","Well"]
+ROLES=["Sarpanch","Ward Member","Secretary","Volunteer"]
+
+WARD_SIZE=150
+CENTER=(18.678054,78.961130)
+
+
+def _pick(rng,options,n):
+    return np.asarray(options,dtype=object)[rng.integers(len(options),size=n)]
+
+
+def _ids(prefix,numbers,width=5):
+    return pd.Series(numbers).map(lambda i:f"{prefix}{i:0{width}d}").to_numpy(dtype=object)
+
+
+def households(n):
+    return max(n//4,1)
+
+
+def make_families(n,seed=0):
+    rng=np.random.default_rng([seed,1])
+    k=households(n)
+    return pd.DataFrame({
+        "Family_ID":_ids("F",np.arange(k)),
+        "Head_of_Family":_pick(rng,SURNAMES,k)+" "+_pick(rng,NAMES,k),
+        "Address":rng.integers(1,400,size=k).astype(str).astype(object)+", "+_pick(rng,STREETS,k),
+    })
+
+
+def make_pupils(n,seed=0):
+    rng=np.random.default_rng([seed,2])
+    voter=rng.permutation(n).astype(float)
+    voter[rng.random(n)>=0.8]=np.nan   # children and unregistered members
+    return pd.DataFrame({
+        "Name":_pick(rng,SURNAMES,n)+" "+_pick(rng,NAMES,n),
+        "Family_ID":_ids("F",rng.integers(households(n),size=n)),
+        "Relation":_pick(rng,RELATIONS,n),
+        "Age":rng.integers(1,90,size=n),
+        "Voter_ID":voter,
+    })
+
+
+def make_ward_ranges(n):
+    starts=np.arange(0,max(n,1),WARD_SIZE)
+    return pd.DataFrame({"Ward":np.arange(1,len(starts)+1),"Start":starts,"End":starts+WARD_SIZE-1})
+
+
+def make_places(n,seed=0):
+    rng=np.random.default_rng([seed,3])
+    k=max(households(n)//10,1)
+    types=_pick(rng,PLACE_TYPES,k)
+    return pd.DataFrame({
+        "Name":_pick(rng,SURNAMES,k)+" "+types,
+        "Type":types,
+        "Latitude":(CENTER[0]+rng.normal(0,0.01,size=k)).round(6),
+        "Longitude":(CENTER[1]+rng.normal(0,0.01,size=k)).round(6),
+    })
+
+
+def make_team(n,seed=0):
+    rng=np.random.default_rng([seed,4])
+    k=min(max(n//1000,5),200)
+    return pd.DataFrame({"Name":_pick(rng,SURNAMES,k)+" "+_pick(rng,NAMES,k),"Role":_pick(rng,ROLES,k)})
+
+
+def make_village(n,seed=0):
+    return {
+        "families":make_families(n,seed),
+        "pupils":make_pupils(n,seed),
+        "places":make_places(n,seed),
+        "ward_ranges":make_ward_ranges(n),
+        "team":make_team(n,seed),
+    }
+
+
+def write_village(base_dir,n,seed=0):
+    base_dir=Path(base_dir)
+    base_dir.mkdir(parents=True,exist_ok=True)
+    tables=make_village(n,seed)
+    for name,df in tables.items():
+        df[SCHEMAS[name]].to_csv(base_dir/f"{name}.csv",index=False)
+    return tables
+
+
+if __name__=="__main__":
+    out,rows=sys.argv[1],int(sys.argv[2])
+    write_village(out,rows,int(sys.argv[3]) if len(sys.argv)>3 else 0)
+    print(f"wrote a {rows}-row village to {out}")
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0,str(Path(__file__).resolve().parent.parent))
+
+import data_cache
+import journal
+from storage import CsvStorage
+
+
+@pytest.fixture
+def store(tmp_path,monkeypatch):
+    # compaction in tests happens only where a test asks for it
+    monkeypatch.setattr(journal,"IDLE_SECONDS",3600)
+    data_cache.invalidate()
+    (tmp_path/"families.csv").write_text(
+        "Family_ID,Head_of_Family,Address,Contact,WARD NO\n"
+        "F001,GUDISE RAMULU,MAIN ROAD,9876543210,7\n"
+        "F002,GUDISE ARAVINDH,,,\n"
+        "F003,KOTA BALAVVA,TEMPLE STREET,,3\n")
+    (tmp_path/"pupils.csv").write_text(
+        "Name,Family_ID,Relation,Age,Voter_ID\n"
+        "GUDISE RAMULU,F001,HEAD,52,222\n"
+        "GUDISE ARAVINDH,F002,SON,24,ABC991\n"
+        "GUDISE BALAVVA,F002,MOTHER,61,\n"
+        "KOTA BALAVVA,F003,HEAD,45,310\n")
+    yield CsvStorage(tmp_path)
+    data_cache.invalidate()
@@ -0,0 +1,35 @@
+import json
+
+import api
+
+
+def get(service,target,headers=None):
+    status,head,body=service.get(target,headers)
+    return status,head,json.loads(body) if body else None
+
+
+def test_household_and_revalidation(store):
+    service=api.Api(store)
+    status,head,body=get(service,"/api/households/F002")
+    assert status==200
+    assert [r[0] for r in body["members"]["data"]]==["GUDISE ARAVINDH","GUDISE BALAVVA"]
+
+    assert get(service,"/api/households/F002",{"If-None-Match":head["ETag"]})[0]==304
+    store.add("pupils",{"Name":"NEW CHILD","Family_ID":"F002"})
+    status,_,body=get(service,"/api/households/F002",{"If-None-Match":head["ETag"]})
+    assert status==200 and len(body["members"]["data"])==3
+
+
+def test_search_after_write(store):
+    service=api.Api(store)
+    get(service,"/api/search?q=gudise&table=pupils")
+    store.delete("pupils",0)
+    _,_,body=get(service,"/api/search?q=gudise&table=pupils")
+    assert [r[0] for r in body["results"]["pupils"]["data"]]==["GUDISE ARAVINDH","GUDISE BALAVVA"]
+
+
+def test_errors(store):
+    service=api.Api(store)
+    assert get(service,"/api/search")[0]==400
+    assert get(service,"/api/households/NOPE")[0]==404
+    assert get(service,"/api/nothing")[0]==404
@@ -0,0 +1,49 @@
+import io
+
+import pandas as pd
+
+import bulk
+
+
+def upload(text):
+    f=io.BytesIO(text.encode())
+    f.name="rows.csv"
+    return f
+
+
+def test_export_is_bytes_that_read_back(store):
+    df=store.read("pupils")
+    data=bulk.export(df,chunksize=2)
+    assert isinstance(data,bytes)
+    back=pd.read_csv(io.BytesIO(data),dtype=str,keep_default_na=False)
+    assert back.columns.tolist()==df.columns.tolist()
+    assert back["Name"].tolist()==df["Name"].tolist()
+    assert back["Voter_ID"].tolist()==["222","ABC991","","310"]
+
+
+def test_export_of_empty_table_has_header():
+    assert bulk.export(pd.DataFrame(columns=["Name","Role"]))==b"Name,Role\n"
+
+
+def test_validate_then_import(store):
+    result=bulk.validate("families",upload(
+        "Family_ID,Head_of_Family,Address\n"
+        "F001,DUPLICATE,\n"
+        ",NO ID,\n"
+        "F010,NEW FAMILY,SCHOOL ROAD\n"),store.read("families"))
+    assert result["total"]==3
+    assert sorted(result["errors"]["Row"])==[2,3]
+    store.add_many("families",result["rows"].to_dict("records"))
+    df=store.read("families")
+    assert df["Family_ID"].tolist()[-1]=="F010"
+    assert "9876543210," in store.path("families").read_text()
+
+
+def test_exported_ward_list_imports_back(store):
+    df=store.read("pupils")
+    view=df.assign(Ward=[7,3,3,None])   # as the Pupils page exports it
+    data=bulk.export(view[view["Ward"]==3])
+    result=bulk.validate("pupils",upload(data.decode()),df.iloc[0:0])
+    assert result["errors"].empty
+    assert result["rows"].columns.tolist()==df.columns.tolist()
+    assert result["rows"]["Name"].tolist()==["GUDISE ARAVINDH","GUDISE BALAVVA"]
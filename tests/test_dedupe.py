@@ -0,0 +1,54 @@
+import dedupe
+import village_stats
+from schema import SCHEMAS
+from storage import CsvStorage
+
+
+def pairs(found):
+    return sorted(zip(found["a"],found["b"],found["Score"]))
+
+
+def test_incremental_matches_full_rebuild(store,tmp_path):
+    finder=dedupe.Deduper(store,tmp_path/"dedupe.json")
+    assert pairs(finder.suggestions("pupils"))==[]
+
+    store.add("pupils",{"Name":"GUDISE ARAVIND","Family_ID":"F002","Relation":"SON","Age":"24"})
+    store.add("pupils",{"Name":"KOTA BALAVA","Family_ID":"F003","Age":"45","Voter_ID":"310"})
+    store.update("pupils",2,{"Name":"GUDISE BALAVVA","Age":"62"})
+    store.delete("pupils",0)
+
+    fresh=dedupe.Deduper(store,tmp_path/"other.json")
+    assert pairs(finder.suggestions("pupils"))==pairs(fresh.suggestions("pupils"))
+    assert {(a,b) for a,b,_ in pairs(fresh.suggestions("pupils"))}=={(1,4),(3,5)}
+
+
+def test_dismissed_pairs_stay_dismissed(store,tmp_path):
+    store.add("pupils",{"Name":"KOTA BALAVVA","Family_ID":"F003","Age":"45","Voter_ID":"310"})
+    finder=dedupe.Deduper(store,tmp_path/"dedupe.json")
+    (a,b,_),=pairs(finder.suggestions("pupils"))
+    finder.dismiss("pupils",b,a)
+    assert pairs(finder.suggestions("pupils"))==[]
+    assert pairs(dedupe.Deduper(store,tmp_path/"dedupe.json").suggestions("pupils"))==[]
+
+
+def test_empty_tables(tmp_path):
+    store=CsvStorage(tmp_path/"empty")
+    store.base_dir.mkdir()
+    for name,cols in SCHEMAS.items():
+        store.ensure(name,cols)
+    finder=dedupe.Deduper(store,tmp_path/"dedupe.json")
+    for name in dedupe.SPECS:
+        assert pairs(finder.suggestions(name))==[]
+    store.add("pupils",{"Name":"GUDISE RAMULU","Age":"52"})
+    assert pairs(finder.suggestions("pupils"))==[]
+
+
+def test_family_merge_moves_members(store):
+    stats=village_stats.VillageStats(store,store.base_dir/"village_stats.json")
+    store.add("families",{"Family_ID":"F004","Head_of_Family":"KOTA BALAVA","Address":"TEMPLE STREET"})
+    store.add("pupils",{"Name":"KOTA RAVI","Family_ID":"F004","Relation":"SON","Age":"12"})
+    dedupe.merge(stats,store.read("families"),"families",2,3)
+
+    assert store.find("families","Family_ID","F004").empty
+    assert store.find("pupils","Family_ID","F004").empty
+    assert store.find("pupils","Family_ID","F003")["Name"].tolist()==["KOTA BALAVVA","KOTA RAVI"]
@@ -0,0 +1,111 @@
+import os
+
+import journal
+from journal import Journal
+
+
+def family(fid):
+    return {"Family_ID":fid,"Head_of_Family":"NEW HEAD","Address":"NEW ADDRESS"}
+
+
+def test_replay_applies_add_update_delete(store):
+    store.add("families",family("F900"))
+    df=store.read("families")
+    store.update("families",df.index[0],{"Address":"CHANGED"})
+    store.delete("families",df.index[1])
+    df=store.read("families")
+    assert df["Family_ID"].tolist()==["F001","F003","F900"]
+    assert df.loc[0,"Address"]=="CHANGED"
+
+
+def test_row_ids_survive_compaction(store):
+    store.add("families",family("F900"))
+    store.delete("families",1)
+    before=store.read("families")
+    store.journal("families").compact()
+    after=store.read("families")
+    assert after.index.tolist()==before.index.tolist()
+    assert after["Family_ID"].tolist()==before["Family_ID"].tolist()
+
+
+def test_hand_edit_keeps_pending_edits_as_backup(store):
+    store.add("families",family("F900"))
+    store.update("families",0,{"Address":"CHANGED"})
+    path=store.path("families")
+    with open(path,"a") as f:
+        f.write("F901,HAND ADDED,,,\n")
+    os.utime(path,ns=(1,1))   # a different version even within the same tick
+    assert len(store.orphaned("families"))==1   # warned about before any write
+    store.add("families",family("F902"))
+
+    df=store.read("families")
+    assert df["Family_ID"].tolist()==["F001","F002","F003","F901","F902"]   # the CSV wins over the old journal
+    assert Journal(path).read()["Family_ID"].tolist()==df["Family_ID"].tolist()
+    backups=store.orphaned("families")
+    assert len(backups)==1
+    kept=backups[0].read_text()
+    assert "F900" in kept and "CHANGED" in kept
+
+
+def test_settle_folds_the_journal_in_before_a_hand_edit(store):
+    store.add("families",family("F900"))
+    store.update("families",0,{"Address":"CHANGED"})
+    store.ensure("families",[])   # what the next start does
+    path=store.path("families")
+    with open(path,"a") as f:
+        f.write("F901,HAND ADDED,,,\n")
+    store.add("families",family("F902"))
+
+    df=store.read("families")
+    assert df["Family_ID"].tolist()==["F001","F002","F003","F900","F901","F902"]
+    assert df.loc[0,"Address"]=="CHANGED"
+    assert store.orphaned("families")==[]
+
+
+def test_idle_journal_is_compacted(store,monkeypatch):
+    j=store.journal("families")
+    monkeypatch.setattr(j,"compact_later",j.compact)
+    monkeypatch.setattr(journal,"IDLE_SECONDS",0)
+    store.add("families",family("F900"))
+    j._idle.join(5)
+    assert "F900" in store.path("families").read_text()
+    assert store.orphaned("families")==[]
+
+
+def test_torn_append_is_ignored(store):
+    store.add("families",family("F900"))
+    with open(store.journal("families").path,"a") as f:
+        f.write('{"op":"add","row":{"Family_ID":"F9')
+    assert store.read("families")["Family_ID"].tolist()[-1]=="F900"
+
+
+def test_compaction_keeps_cells_verbatim(store):
+    path=store.path("families")
+    original=path.read_text()
+    store.journal("families").compact()
+    assert path.read_text()==original
+
+
+def test_extend_keeps_cells_verbatim(store):
+    path=store.path("families")
+    original=path.read_text()
+    store.add_many("families",[family("F900")])
+    assert path.read_text()==original+"F900,NEW HEAD,NEW ADDRESS,,\n"
+
+
+def test_big_journal_is_compacted(store,monkeypatch):
+    monkeypatch.setattr(journal,"COMPACT_BYTES",0)
+    j=store.journal("families")
+    monkeypatch.setattr(j,"compact_later",j.compact)
+    store.add("families",family("F900"))
+    assert "F900" in store.path("families").read_text()
+    assert store.read("families")["Family_ID"].tolist()[-1]=="F900"
+
+
+def test_compacted_table_reads_the_same(store):
+    store.update("pupils",1,{"Age":"25"})
+    before=store.read("pupils")
+    store.journal("pupils").compact()
+    after=store.read("pupils")
+    assert after.astype(str).equals(before.astype(str))
+    assert store.find("pupils","Voter_ID","222")["Name"].tolist()==["GUDISE RAMULU"]
@@ -0,0 +1,17 @@
+import perf
+
+
+def test_fragment_rerun_is_recorded_on_its_own(monkeypatch):
+    monkeypatch.setattr(perf,"ENABLED",True)
+    perf.clear()
+    search=perf.track("Dashboard: search")(lambda q:q.upper())
+
+    assert search("gud")=="GUD"   # a fragment rerun: no run open
+    assert [r["page"] for r in perf.runs]==["Dashboard: search"]
+
+    perf.begin()                  # a full rerun calling the fragment
+    search("gud")
+    perf.end("Dashboard")
+    assert [r["page"] for r in perf.runs]==["Dashboard: search","Dashboard"]
+    assert "Dashboard: search" in perf.runs[-1]["stages"]
+    perf.clear()
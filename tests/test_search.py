@@ -0,0 +1,34 @@
+from search_index import FuzzyIndex,SearchIndex
+
+
+def search(store,name,q):
+    return store.derived(name,"search",SearchIndex).rows(q)
+
+
+def test_search_after_another_session_deletes(store):
+    stale=store.read("pupils")
+    search(store,"pupils","gudise")
+    store.delete("pupils",stale.index[0])
+    hits=search(store,"pupils","gudise aravindh")
+    assert hits["Name"].tolist()==["GUDISE ARAVINDH"]
+
+
+def test_search_after_another_session_adds(store):
+    search(store,"pupils","gudise")
+    store.add("pupils",{"Name":"GUDISE NEW","Family_ID":"F002"})
+    hits=search(store,"pupils","gudise")
+    assert hits["Name"].tolist()==["GUDISE RAMULU","GUDISE ARAVINDH","GUDISE BALAVVA","GUDISE NEW"]
+
+
+def test_rows_keep_row_ids(store):
+    store.delete("pupils",0)
+    hits=search(store,"pupils","balavva")
+    assert hits.index.tolist()==[2,3]
+
+
+def test_fuzzy_search_after_another_session_deletes(store):
+    fuzzy=lambda:store.derived("pupils","fuzzy",lambda d:FuzzyIndex(d,["Name"]))
+    fuzzy().rows("gudise aravind")
+    store.delete("pupils",0)
+    hits=fuzzy().rows("gudise aravind",k=1)
+    assert hits["Name"].tolist()==["GUDISE ARAVINDH"]
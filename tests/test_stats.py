@@ -0,0 +1,37 @@
+import pytest
+
+import village_stats
+
+
+@pytest.fixture
+def stats(store,tmp_path):
+    (tmp_path/"ward_ranges.csv").write_text("Ward,Start,End\n1,0,249\n2,250,499\n")
+    (tmp_path/"leagues.csv").write_text("Sport,Season,Winner,Runner\nKABBADI,1,TEAM A,TEAM B\n")
+    engine=village_stats.VillageStats(store,tmp_path/"village_stats.json")
+    engine.current()
+    return engine
+
+
+def same_as_rebuild(stats):
+    fresh,kept=stats.build(),stats.current()
+    return {k:v for k,v in fresh.items() if k!="versions"}=={k:v for k,v in kept.items() if k!="versions"}
+
+
+def test_writes_keep_counts_equal_to_a_rebuild(stats,store,monkeypatch):
+    def no_lookup(*args):
+        raise AssertionError("a write must not scan for its household")
+    monkeypatch.setattr(store,"find",no_lookup)
+    stats.add("pupils",{"Name":"NEW","Family_ID":"F001","Relation":"SON","Age":"20","Voter_ID":"300"})
+    assert same_as_rebuild(stats)
+    stats.update("pupils",1,{"Family_ID":"F003","Voter_ID":"260","Age":"70"})
+    assert same_as_rebuild(stats)
+    stats.delete("pupils",0)
+    assert same_as_rebuild(stats)
+    stats.add("leagues",{"Sport":"CRICKET","Season":"1","Winner":"TEAM B"})
+    stats.add("pupils",{"Name":"SOLO","Family_ID":"F900","Voter_ID":"10"})
+    assert same_as_rebuild(stats)
+
+
+def test_new_ward_range_rebuilds(stats):
+    stats.add("ward_ranges",{"Ward":3,"Start":500,"End":999})
+    assert same_as_rebuild(stats)
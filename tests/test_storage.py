@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from schema import SCHEMAS
+from storage import SqliteStorage,migrate
+
+
+@pytest.fixture
+def db(store):
+    migrate(store.base_dir,store.base_dir/"village.db")
+    return SqliteStorage(store.base_dir/"village.db",store.base_dir)
+
+
+def test_row_ids_are_not_reused(db):
+    last=db.read("families").index[-1]
+    db.delete("families",last)
+    db.add("families",{"Family_ID":"F900","Head_of_Family":"NEW HEAD"})
+    assert db.read("families").index[-1]>last
+
+
+def test_table_from_before_ids_keeps_its_rowids(tmp_path):
+    path=tmp_path/"village.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE families ("Family_ID" TEXT,"Head_of_Family" TEXT)')
+        conn.executemany("INSERT INTO families VALUES (?,?)",[("F001","A"),("F002","B"),("F003","C")])
+        conn.execute("DELETE FROM families WHERE rowid=2")
+    db=SqliteStorage(path,tmp_path)
+    db.ensure("families",SCHEMAS["families"])
+    assert db.read("families")["Family_ID"].to_dict()=={1:"F001",3:"F003"}
+    db.delete("families",3)
+    db.add("families",{"Family_ID":"F004"})
+    assert db.read("families").index.tolist()==[1,4]
+
+
+def test_migrate_stores_typed_values(store):
+    path=store.path("pupils")
+    path.write_text(path.read_text().replace(",222\n",",222.0\n"))
+    store.add("pupils",{"Name":"NEW PUPIL","Family_ID":"F003","Age":"9"})   # still in the journal
+    migrate(store.base_dir,store.base_dir/"village.db")
+    db=SqliteStorage(store.base_dir/"village.db",store.base_dir)
+
+    assert db.find("pupils","Voter_ID","222")["Name"].tolist()==["GUDISE RAMULU"]
+    assert db.read("pupils").index.tolist()==store.read("pupils").index.tolist()
+    db.add("pupils",{"Name":"LATER PUPIL"})
+    assert db.read("pupils").index[-1]==5
+
+
+@pytest.mark.parametrize("name,column,value",[
+    ("pupils","Voter_ID","222"),
+    ("pupils","Voter_ID","ABC991"),
+    ("pupils","Family_ID","F002"),
+    ("families","Family_ID","F003"),
+])
+def test_find_matches_csv(store,db,name,column,value):
+    assert db.find(name,column,value).index.tolist()==store.find(name,column,value).index.tolist()
+
+
+def test_writes_match_csv(store,db):
+    for s in (store,db):
+        s.add("pupils",{"Name":"NEW PUPIL","Family_ID":"F003","Relation":"SON","Age":"9","Voter_ID":"400"})
+        s.update("pupils",1,{"Age":"25","Relation":"HEAD"})
+        s.delete("pupils",2)
+    csv,sql=store.read("pupils"),db.read("pupils")
+    assert sql.index.tolist()==csv.index.tolist()
+    assert sql.astype(str).equals(csv.astype(str))
+    assert db.find("pupils","Voter_ID","400").index.tolist()==store.find("pupils","Voter_ID","400").index.tolist()
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from wards import WardIndex
+
+
+def index(rows):
+    return WardIndex(pd.DataFrame(rows,columns=["Ward","Start","End"]))
+
+
+def test_overlaps_are_reported_not_matched():
+    wards=index([[1,0,149],[2,100,299],[3,300,449]])
+    assert wards.overlaps==[((2,100,299),(1,0,149))]
+    assert wards.resolve(120)==1
+    assert wards.resolve("ABC310")==3
+
+
+def test_assign_matches_resolve():
+    wards=index([[1,0,149],[2,150,299]])
+    ids=pd.Series([5,"222",None,"ABC991",150.0])
+    assigned=[None if pd.isna(w) else w for w in wards.assign(ids)]
+    assert assigned==[1,2,None,None,2]
+    assert [wards.resolve(v) for v in ids]==[1,2,"Unknown","Unknown",2]
+
+
+def test_compare_with_wards_csv():
+    ranges=index([[1,0,149],[2,150,299],[3,300,449],[4,450,599]])
+    legacy=index([[7,200,599],[8,600,1000]])
+    assert ranges.compare(legacy).values.tolist()==[
+        [0,149,"1","none"],
+        [150,199,"2","none"],
+        [200,299,"2","7"],
+        [300,449,"3","7"],
+        [450,599,"4","7"],
+        [600,1000,"none","8"],
+    ]
+
+
+def test_compare_identical_is_empty():
+    assert index([[1,0,9]]).compare(index([[1,0,9]])).empty
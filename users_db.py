@@ -3,10 +3,13 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 import os
-import folium
-from streamlit_folium import st_folium
 from streamlit_option_menu import option_menu
-import time
+import bootstrap
+import images
+import records
+from key_index import household_ids
+from paging import paged_table
+from search_index import SearchIndex
 
 st.set_page_config(page_title="My Village Digital Portal", page_icon="🏡", layout="wide")
 BASE_DIR = Path(__file__).parent
@@ -63,19 +66,11 @@ border-radius:10px;
 """, unsafe_allow_html=True)
 
 # ---------------- FILE SETUP ----------------
-def ensure_file(file, cols):
-    if not os.path.exists(file):
-        pd.DataFrame(columns=cols).to_csv(file,index=False)
-
-ensure_file("families.csv",["Family_ID","Head_of_Family","Address"])
-ensure_file("pupils.csv",["Name","Family_ID","Relation","Age","Voter_ID"])
-ensure_file("places.csv",["Name","Type","Latitude","Longitude"])
-ensure_file("team.csv",["Name","Role"])
-ensure_file("gallery.csv",["Image"])
-ensure_file("dashboard_media.csv",["Image","Caption"])
+# tables are created once per server process (bootstrap.py)
+store=bootstrap.portal(BASE_DIR).store
 
 def load(file):
-    return pd.read_csv(file)
+    return store.read(Path(file).stem)
 
 # ---------------- LOGIN ----------------
 if "role" not in st.session_state:
@@ -134,13 +129,12 @@ dash_media=load("dashboard_media.csv")
 # ====================================================
 # FAST SEARCH INDEX (NEW)
 # ====================================================
-@st.cache_data
 def build_search_index(families,pupils,places,team):
     return {
-        "families":families.astype(str),
-        "pupils":pupils.astype(str),
-        "places":places.astype(str),
-        "team":team.astype(str)
+        "families":(families,store.derived("families","search",SearchIndex)),
+        "pupils":(pupils,store.derived("pupils","search",SearchIndex)),
+        "places":(places,store.derived("places","search",SearchIndex)),
+        "team":(team,store.derived("team","search",SearchIndex))
     }
 
 search_index=build_search_index(families,pupils,places,team)
@@ -155,8 +149,9 @@ if selected=="Dashboard":
     # -------- DASHBOARD IMAGE SLIDER --------
     st.subheader("🌄 Village Highlights")
     for _,r in dash_media.iterrows():
-        if os.path.exists(r["Image"]):
-            st.image(r["Image"],use_column_width=True)
+        thumb=images.thumbnail(r["Image"]) if os.path.exists(r["Image"]) else None
+        if thumb:
+            st.image(str(thumb),width="stretch")
             st.caption(r["Caption"])
 
     st.divider()
@@ -178,29 +173,29 @@ if selected=="Dashboard":
         found=False
 
         # PUPIL SEARCH + FAMILY DETAILS
-        res=search_index["pupils"][search_index["pupils"].apply(
-            lambda x:x.str.contains(query,case=False)).any(axis=1)]
+        data,index=search_index["pupils"]
+        res=index.rows(query)
 
         if not res.empty:
             found=True
             st.success("👤 Person Found")
-            st.dataframe(res)
+            paged_table(res,"search_pupils")
 
-            for _,row in res.iterrows():
-                fam=families[families["Family_ID"]==row["Family_ID"]]
+            for fid in household_ids(res)[:20]:
+                fam=store.find("families","Family_ID",fid)
                 if not fam.empty:
                     st.info("👨‍👩‍👧 Family Details")
                     st.write("Family Head:",fam.iloc[0]["Head_of_Family"])
                     st.write("Address:",fam.iloc[0]["Address"])
                     st.subheader("Full Family Members")
-                    st.dataframe(pupils[pupils["Family_ID"]==row["Family_ID"]])
+                    st.dataframe(store.find("pupils","Family_ID",fid))
 
         # OTHER TABLES SEARCH
-        for name,data in search_index.items():
-            r=data[data.apply(lambda x:x.str.contains(query,case=False)).any(axis=1)]
+        for name,(data,index) in search_index.items():
+            r=index.rows(query)
             if not r.empty and name!="pupils":
                 st.success(f"{name.title()} Results")
-                st.dataframe(r)
+                paged_table(r,f"search_{name}")
                 found=True
 
         if not found:
@@ -211,40 +206,10 @@ if selected=="Dashboard":
     # -------- MAP WITH VILLAGE OUTLINE (NEW) --------
     st.subheader("🗺 Village Map")
 
-    main_lat=18.678054
-    main_lon=78.961130
-
-    m=folium.Map(location=[main_lat,main_lon],zoom_start=15)
-
-    # Village center marker
-    folium.Marker([main_lat,main_lon],
-        popup="SARVAPOOR KOTHAPALLE",
-        icon=folium.Icon(color="red")).add_to(m)
-
-    # Village boundary outline (you can change coordinates)
-    village_boundary=[
-        [18.6795,78.9590],
-        [18.6805,78.9620],
-        [18.6775,78.9640],
-        [18.6765,78.9605]
-    ]
-
-    folium.Polygon(
-        locations=village_boundary,
-        color="blue",
-        fill=True,
-        fill_opacity=0.2,
-        popup="Sarvapoor Kothapalle Boundary"
-    ).add_to(m)
-
-    # places markers
-    for _,r in places.iterrows():
-        try:
-            folium.Marker([float(r["Latitude"]),float(r["Longitude"])],
-                          popup=r["Name"]).add_to(m)
-        except: pass
-
-    st_folium(m,width=700)
+    # boundary + clustered place markers, rendered once per places version;
+    # folium is only imported once someone opens the Dashboard
+    from village_map import map_html,show as show_map
+    show_map(store.derived("places","map",map_html))
 
 # ====================================================
 # ADMIN CONTROL PANEL (UNCHANGED)
@@ -252,7 +217,7 @@ if selected=="Dashboard":
 def admin_controls(df,file,cols,title):
 
     st.header(title)
-    st.dataframe(df)
+    paged_table(df,title)
 
     if st.session_state.role!="admin":
         return
@@ -261,33 +226,52 @@ def admin_controls(df,file,cols,title):
 
     tab1,tab2,tab3=st.tabs(["Add","Edit","Delete"])
 
+    name=Path(file).stem
+
     with tab1:
         data={}
         for c in cols:
             data[c]=st.text_input(f"Enter {c}")
         if st.button("Add Record"):
-            pd.DataFrame([data]).to_csv(file,mode="a",header=False,index=False)
-            st.success("Added — Refresh")
+            problem=records.taken(store,name,data)
+            if problem:
+                st.error(problem)
+            else:
+                store.add(name,data)
+                st.success("Added — Refresh")
 
     with tab2:
-        if len(df)>0:
-            idx=st.number_input("Row Number",0,len(df)-1)
+        key=records.pick(store,df,name,title,"edit")
+        if key is not None:
+            row=df.loc[key]
+            before=records.remember(title,"edit",key,row)
             new={}
             for c in cols:
-                new[c]=st.text_input(f"New {c}",df.iloc[idx][c])
+                old=row[c]
+                new[c]=st.text_input(f"New {c}","" if pd.isna(old) else str(old),key=f"{title}_new_{c}_{key}")
             if st.button("Update Record"):
-                df.loc[idx]=list(new.values())
-                df.to_csv(file,index=False)
-                st.success("Updated")
+                problem=records.stale(before,key,row) or records.taken(store,name,new,key,row)
+                if problem:
+                    st.error(problem)
+                else:
+                    store.update(name,key,new)
+                    records.remember(title,"edit",key,store.read(name).loc[key])
+                    st.success("Updated")
 
     with tab3:
-        if len(df)>0:
-            d=st.number_input("Row Number to Delete",0,len(df)-1)
+        key=records.pick(store,df,name,title,"delete")
+        if key is not None:
+            row=df.loc[key]
+            before=records.remember(title,"delete",key,row)
+            st.dataframe(df.loc[[key]])
             confirm=st.checkbox("Confirm Delete")
             if st.button("Delete Record") and confirm:
-                df=df.drop(d)
-                df.to_csv(file,index=False)
-                st.success("Deleted")
+                problem=records.stale(before,key,row)
+                if problem:
+                    st.error(problem)
+                else:
+                    store.delete(name,key)
+                    st.success("Deleted")
 
 # ====================================================
 # DATA SECTIONS
@@ -317,16 +301,17 @@ if selected=="Village Gallery":
 
     if st.session_state.role=="admin":
         img=st.file_uploader("Upload Image",type=["jpg","png"])
-        if img:
-            os.makedirs("gallery",exist_ok=True)
-            path=f"gallery/{time.time()}.jpg"
-            with open(path,"wb") as f: f.write(img.read())
-            pd.DataFrame([[path]],columns=["Image"]).to_csv("gallery.csv",mode="a",header=False,index=False)
-            st.success("Uploaded")
-
-    for _,r in gallery.iterrows():
-        if os.path.exists(r["Image"]):
-            st.image(r["Image"],width=300)
+        # the uploader keeps its file across reruns: copy and hash each one once
+        if img and st.session_state.get("gallery_upload")!=img.file_id:
+            info=images.store_upload(img,"gallery")
+            st.session_state["gallery_upload"]=img.file_id
+            if not images.is_known(gallery,info["SHA256"]):
+                row={c:info[c] for c in images.GALLERY[1:]}
+                store.add("gallery",{"Image":info["path"].as_posix(),**row})
+                gallery=load("gallery.csv")
+                st.success("Uploaded")
+
+    images.gallery_grid([p for p in gallery["Image"] if os.path.exists(p)],"gallery")
 
 # ====================================================
 # DASHBOARD MEDIA CONTROL
@@ -339,8 +324,9 @@ if selected=="Dashboard Media":
         img=st.file_uploader("Upload Dashboard Image",type=["jpg","png"])
         caption=st.text_input("Caption")
         if st.button("Upload"):
-            os.makedirs("dashboard_media",exist_ok=True)
-            path=f"dashboard_media/{time.time()}.jpg"
-            with open(path,"wb") as f: f.write(img.read())
-            pd.DataFrame([[path,caption]],columns=["Image","Caption"]).to_csv("dashboard_media.csv",mode="a",header=False,index=False)
+            if img is None:
+                st.error("Choose an image first")
+                st.stop()
+            info=images.store_upload(img,"dashboard_media")
+            store.add("dashboard_media",{"Image":info["path"].as_posix(),"Caption":caption})
             st.success("Added to Dashboard")
@@ -0,0 +1,37 @@
+import importlib
+
+import perf
+
+
+# ---------------- PAGES ----------------
+# One module per menu page, imported the first time that page is shown: the
+# Dashboard's map pulls in folium, which no other page needs, and each page
+# reads only the tables it shows. Every page function takes the Portal from
+# bootstrap.portal().
+
+PAGES={
+    "Dashboard":("dashboard","render"),
+    "Families":("tables","families"),
+    "Pupils":("tables","pupils"),
+    "Village Team":("tables","team"),
+    "Places":("tables","places"),
+    "Village Leagues":("tables","leagues"),
+    "Youth Association":("tables","youth"),
+    "Ward Settings":("ward_settings","render"),
+    "Village Gallery":("gallery","render"),
+    "Performance":("performance","render"),
+}
+
+
+def load(store,name):
+    with perf.stage("load"):
+        return store.read(name)
+
+
+def show(page,portal):
+    if page not in PAGES:
+        return
+    module,fn=PAGES[page]
+    with perf.stage("import"):
+        view=importlib.import_module(f"views.{module}")
+    getattr(view,fn)(portal)
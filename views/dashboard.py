@@ -0,0 +1,189 @@
+import inspect
+
+import streamlit as st
+
+import geo
+import perf
+import village_map
+import village_stats
+from key_index import household_ids
+from paging import paged_table
+from search_index import FuzzyIndex,SearchIndex
+from views import load
+from wards import WardIndex
+
+
+# ---------------- DASHBOARD ----------------
+
+TABLES=["families","pupils","places","team","leagues","youth"]
+HOUSEHOLDS_SHOWN=20
+
+# typo-tolerant name search: one FuzzyIndex per table over its name columns
+NAME_COLUMNS={"pupils":["Name"],"families":["Head_of_Family"],"team":["Name","Role"],"places":["Name"]}
+
+# older Streamlit: no fragments or live inputs, search reruns the page on Enter
+fragment=getattr(st,"fragment",lambda f:f)
+SEARCH_LIVE={"live":"400ms"} if "live" in inspect.signature(st.text_input).parameters else {}
+
+
+def prepare(store,name):
+    with perf.stage("prepare"):
+        return store.derived(name,"search",SearchIndex)
+
+
+def exact_match(store,name,q):
+    index=prepare(store,name)
+    with perf.stage(f"search:{name}"):
+        return index.rows(q)
+
+
+def fuzzy_match(store,name,q):
+    columns=NAME_COLUMNS[name]
+    with perf.stage(f"fuzzy:{name}"):
+        index=store.derived(name,"fuzzy",lambda d:FuzzyIndex(d,columns))
+        return index.rows(q)
+
+
+def detect_ward(store,voter_id):
+    with perf.stage("detect_ward"):
+        return store.derived("ward_ranges","wards",WardIndex).resolve(voter_id)
+
+
+# ---------------- GLOBAL SEARCH ----------------
+# a fragment: typing reruns only the search, not the metrics and the map.
+# The query commits after a typing pause; a query extending the last one
+# reuses its hits (see SearchIndex). A fragment rerun keeps the frames of
+# the last full run, so rows come from the index's own frame instead.
+@fragment
+@perf.track("Dashboard: search")
+def global_search(store):
+    st.subheader("Smart Global Search")
+
+    query=st.text_input("Search anything",**SEARCH_LIVE)
+    fuzzy=st.toggle("Similar names (typo-tolerant)",help="Ranks person, family head, team and place names by similarity")
+
+    if not query:
+        return
+    q=query.lower()
+    found=False
+
+    def lookup(name):
+        if fuzzy and name in NAME_COLUMNS:
+            return fuzzy_match(store,name,q)
+        return exact_match(store,name,q)
+
+    # PERSON SEARCH
+    person=lookup("pupils")
+    if not person.empty:
+        st.success("Person Found")
+        paged_table(person,"search_person")
+
+        voter=person.iloc[0]["Voter_ID"]
+        ward=detect_ward(store,voter)
+        st.info(f"Detected Ward: {ward}")
+
+        # each matching household once, however many members matched
+        fids=household_ids(person)
+        for fid in fids[:HOUSEHOLDS_SHOWN]:
+            with st.expander(f"Family {fid}",expanded=len(fids)==1):
+                st.subheader("Family Head")
+                perf.dataframe(store.find("families","Family_ID",fid))
+
+                st.subheader("Full Family Members")
+                perf.dataframe(store.find("pupils","Family_ID",fid))
+        if len(fids)>HOUSEHOLDS_SHOWN:
+            st.caption(f"Showing {HOUSEHOLDS_SHOWN} of {len(fids)} families")
+
+        # ✅ show youth if exists
+        youth_match=exact_match(store,"youth",q)
+        if not youth_match.empty:
+            st.subheader("Youth Association")
+            paged_table(youth_match,"search_person_youth")
+
+        found=True
+
+    for name,label in [("families","Family"),("team","Team"),("places","Place"),
+                       ("leagues","League"),("youth","Youth Association")]:
+        hits=lookup(name)
+        if not hits.empty:
+            st.success(f"{label} Found")
+            paged_table(hits,f"search_{name}")
+            found=True
+
+    if not found:
+        st.error("Data Not Found")
+
+
+def render(portal):
+    store,stats=portal.store,portal.stats
+    data={name:load(store,name) for name in TABLES}
+
+    st.title("Village Dashboard")
+
+    c1,c2,c3,c4=st.columns(4)
+    c1.metric("Families",len(data["families"]))
+    c2.metric("Members",len(data["pupils"]))
+    c3.metric("Places",len(data["places"]))
+    c4.metric("Team",len(data["team"]))
+
+    # ---------------- VILLAGE STATISTICS ----------------
+    # kept up to date on every admin write (village_stats.py), never scanned here
+    with perf.stage("stats"):
+        counts=stats.current()
+    with st.expander("Village Statistics"):
+        t1,t2,t3,t4=st.tabs(["Wards","Ages","Households","Leagues"])
+        with t1:
+            wards_df=village_stats.ward_table(counts)
+            st.bar_chart(wards_df,x="Ward",y=["Population","Voters"])
+            st.dataframe(wards_df)
+        with t2:
+            st.bar_chart(village_stats.age_table(counts),x="Age",y="Members")
+        with t3:
+            st.bar_chart(village_stats.household_table(counts),x="Members",y="Households")
+        with t4:
+            st.dataframe(village_stats.league_table(counts))
+
+    st.divider()
+
+    global_search(store)
+
+    st.divider()
+
+    st.subheader("Village Map")
+    village(portal)
+
+
+# ---------------- MAP + NEARBY ----------------
+# a fragment too: panning the live map reruns only this part
+@fragment
+@perf.track("Dashboard: map")
+def village(portal):
+    store=portal.store
+    with perf.stage("map"):
+        index=geo.index(store,portal.base_dir)
+        if village_map.st_folium:
+            base=store.derived("places","live_map",village_map.live_map)
+            shown=village_map.show_viewport(index,base)
+        else:
+            html=geo.derived(store,portal.base_dir,"map",village_map.map_html)
+    if village_map.st_folium:
+        st.caption(f"Showing {len(shown)} of {len(index)} places in view")
+    else:
+        perf.sent(len(html))
+        village_map.show(html)
+
+    with st.expander("Nearby"):
+        c1,c2=st.columns(2)
+        lat=c1.number_input("Latitude",value=village_map.CENTER[0],format="%.6f",key="near_lat")
+        lon=c2.number_input("Longitude",value=village_map.CENTER[1],format="%.6f",key="near_lon")
+        c3,c4,c5=st.columns(3)
+        kind=c3.selectbox("Category",["Any"]+index.categories,key="near_kind")
+        n=c4.number_input("How many",1,50,5,key="near_n")
+        radius=c5.number_input("Within metres (0: any distance)",0,value=0,step=100,key="near_radius")
+        category=None if kind=="Any" else kind
+        with perf.stage("geo"):
+            found=index.within(lat,lon,radius,category).head(n) if radius else index.nearest(lat,lon,n,category)
+        if found.empty:
+            st.info("No places with coordinates match")
+        else:
+            perf.dataframe(found)
@@ -0,0 +1,53 @@
+import streamlit as st
+
+import images
+from views import load
+
+
+# ====================================================
+# VILLAGE GALLERY (USERS CAN UPLOAD)
+# ====================================================
+def render(portal):
+    store=portal.store
+
+    st.header("📸 Village Gallery")
+
+    gallery = load(store,"gallery")
+    image_folder = portal.base_dir / "gallery_images"
+    image_folder.mkdir(exist_ok=True)
+
+    # ---------------- UPLOAD IMAGE ----------------
+    uploaded_file = st.file_uploader("Upload Village Photo", type=["jpg","png","jpeg"])
+
+    # the uploader keeps its file across reruns: copy and hash each one once
+    if uploaded_file and st.session_state.get("gallery_upload") != uploaded_file.file_id:
+        info = images.store_upload(uploaded_file, image_folder)
+        st.session_state["gallery_upload"] = uploaded_file.file_id
+
+        if not images.is_known(gallery, info["SHA256"]):
+            store.add("gallery", {**{c: info[c] for c in images.GALLERY[1:]}, "Image": info["path"].name})
+            st.success("Image uploaded successfully")
+            st.rerun()
+
+    st.divider()
+
+    # ---------------- SHOW IMAGES ----------------
+    if len(gallery)==0:
+        st.info("No images uploaded yet")
+    else:
+        paths = [image_folder / name for name in gallery["Image"]]
+        images.gallery_grid([p for p in paths if p.exists()],"gallery")
+
+    # ---------------- ADMIN DELETE ----------------
+    if st.session_state.role=="admin" and len(gallery)>0:
+        st.divider()
+        st.subheader("Delete Image (Admin Only)")
+
+        idx = st.number_input("Select Image Row",0,len(gallery)-1)
+
+        if st.button("Delete Image"):
+            images.remove(image_folder / gallery.iloc[idx]["Image"])
+
+            store.delete("gallery",gallery.index[idx])
+            st.success("Deleted")
+            st.rerun()
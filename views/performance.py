@@ -0,0 +1,43 @@
+import os
+
+import streamlit as st
+
+import perf
+
+
+# ====================================================
+# PERFORMANCE (ADMIN ONLY)
+# ====================================================
+def render(portal):
+    st.header("Performance")
+
+    if st.session_state.role!="admin":
+        st.warning("Admin only")
+        st.stop()
+
+    if not perf.ENABLED:
+        st.info("Rerun timing is off. Start the portal with VILLAGE_PROFILE=1 "
+                "(or VILLAGE_PROFILE=cprofile to keep a profile of the slowest rerun).")
+        st.stop()
+
+    recent=perf.recent()
+    c1,c2,c3=st.columns(3)
+    c1.metric("Reruns recorded",len(perf.runs))
+    if len(recent):
+        c2.metric("Cache hits / misses",f"{recent['Cache hits'].sum()} / {recent['Cache misses'].sum()}")
+        c3.metric("Avg bytes sent",f"{recent['Bytes'].mean()/1024:.0f} KB")
+
+    st.subheader("Time per stage")
+    st.dataframe(perf.summary())
+
+    st.subheader("Recent reruns")
+    st.dataframe(recent)
+
+    if perf.slowest["path"] and os.path.exists(perf.slowest["path"]):
+        with open(perf.slowest["path"],"rb") as f:
+            st.download_button(f"cProfile of slowest rerun ({perf.slowest['ms']:.0f} ms, {perf.slowest['page']})",
+                               f.read(),file_name="slowest_rerun.prof")
+
+    if st.button("Clear"):
+        perf.clear()
+        st.rerun()
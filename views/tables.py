@@ -0,0 +1,197 @@
+import pandas as pd
+import streamlit as st
+
+import bulk
+import dedupe
+import perf
+import records
+from paging import paged_table
+from schema import SCHEMAS
+from views import load
+from wards import WardIndex
+
+
+# ====================================================
+# ADMIN CONTROL FUNCTION
+# ====================================================
+def admin_controls(portal,df,name,title,view=None):
+    st.header(title)
+    paged_table(df if view is None else view,title)
+
+    if st.session_state.role!="admin":
+        return
+
+    for backup in portal.store.orphaned(name):
+        st.warning(f"{backup.name} holds admin edits made before {name}.csv was changed by hand. "
+                   "They are not in the table: re-enter them, then delete the file.")
+
+    stats=portal.stats
+    cols=SCHEMAS[name]
+
+    tabs=st.tabs(["Add","Edit","Delete","Import / Export"]+(["Duplicates"] if name in dedupe.SPECS else []))
+    tab1,tab2,tab3,tab4=tabs[:4]
+
+    with tab1:
+        data={}
+        for c in cols:
+            data[c]=st.text_input(f"{c}",key=f"{title}_{c}")
+        if st.button("Add"):
+            problem=records.taken(portal.store,name,data)
+            if problem:
+                st.error(problem)
+            else:
+                stats.add(name,data)
+                st.success("Added")
+
+    # records are picked by key or search and written by their stable row id
+    with tab2:
+        key=records.pick(portal.store,df,name,title,"edit")
+        if key is not None:
+            row=df.loc[key]
+            before=records.remember(title,"edit",key,row)
+            new={}
+            for c in cols:
+                old=row[c]
+                new[c]=st.text_input(f"New {c}","" if pd.isna(old) else str(old),key=f"{title}_new_{c}_{key}")
+            if st.button("Update"):
+                problem=records.stale(before,key,row) or records.taken(portal.store,name,new,key,row)
+                if problem:
+                    st.error(problem)
+                else:
+                    stats.update(name,key,new)
+                    records.remember(title,"edit",key,portal.store.read(name).loc[key])
+                    st.success("Updated")
+
+    with tab3:
+        key=records.pick(portal.store,df,name,title,"delete")
+        if key is not None:
+            row=df.loc[key]
+            before=records.remember(title,"delete",key,row)
+            perf.dataframe(df.loc[[key]])
+            if st.button("Delete"):
+                problem=records.stale(before,key,row)
+                if problem:
+                    st.error(problem)
+                else:
+                    stats.delete(name,key)
+                    st.success("Deleted")
+
+    with tab4:
+        bulk_controls(portal,df,name,title,df if view is None else view)
+
+    if name in dedupe.SPECS:
+        with tabs[4]:
+            duplicate_controls(portal,df,name,title)
+
+
+# ====================================================
+# BULK IMPORT / EXPORT
+# ====================================================
+def bulk_controls(portal,df,name,title,view):
+    st.subheader("Import")
+    upload=st.file_uploader(f"Rows to add ({', '.join(bulk.FORMATS)}, with the table's column names)",
+                            type=bulk.FORMATS,key=f"{title}_import")
+    if upload:
+        # validated once per file and table version, not on every rerun
+        token=(upload.file_id,portal.store.version(name))
+        checked=st.session_state.get(f"{title}_checked")
+        if checked is None or checked[0]!=token:
+            try:
+                with perf.stage("import:validate"):
+                    checked=(token,bulk.validate(name,upload,df))
+            except ValueError as e:
+                st.error(str(e))
+                checked=None
+            st.session_state[f"{title}_checked"]=checked
+
+        if checked:
+            result=checked[1]
+            rows,errors=result["rows"],result["errors"]
+            st.info(f"{len(rows)} of {result['total']} rows are ready to import")
+            if len(errors):
+                st.warning(f"{errors['Row'].nunique()} rows have errors and will be skipped")
+                paged_table(errors,f"{title}_import_errors")
+            if len(rows) and st.button(f"Import {len(rows)} rows",key=f"{title}_import_commit"):
+                portal.stats.add_many(name,rows.to_dict("records"))
+                st.success(f"Imported {len(rows)} rows")
+
+    st.subheader("Export")
+    if "Ward" in view and name!="ward_ranges":
+        wards=["All wards"]+sorted(view["Ward"].dropna().unique().tolist())
+        ward=st.selectbox("Ward",wards,key=f"{title}_export_ward")
+        if ward!="All wards":
+            view=view[view["Ward"]==ward]
+    fmt=st.radio("Format",bulk.FORMATS,horizontal=True,key=f"{title}_export_format")
+    # the file is built only when the button is pressed
+    st.download_button(f"Download {len(view)} rows",lambda:bulk.export(view,fmt),
+                       file_name=f"{name}.{fmt}",key=f"{title}_export")
+
+
+# ====================================================
+# DUPLICATES
+# ====================================================
+def duplicate_controls(portal,df,name,title):
+    engine=dedupe.engine(portal.store,portal.base_dir)
+    with perf.stage("dedupe"):
+        found=engine.suggestions(name)
+    found=found[found["a"].isin(df.index)&found["b"].isin(df.index)].reset_index(drop=True)
+    if found.empty:
+        st.success("No likely duplicates")
+        return
+
+    found=found.assign(First=dedupe.describe(df,name,found["a"]),Second=dedupe.describe(df,name,found["b"]))
+    st.caption(f"{len(found)} likely duplicate pairs, most similar first")
+    paged_table(found[["First","Second","Score","Reasons"]],f"{title}_duplicates")
+
+    # picked by the (a,b) row-id pair, not its place in the list: another
+    # admin's merge reorders the list between the rerun and the click
+    pairs=found["a"].astype(str)+":"+found["b"].astype(str)
+    labels=dict(zip(pairs,found["First"]+"  ↔  "+found["Second"]))
+    pair=st.selectbox("Suggestion",list(labels),format_func=labels.get,key=f"{title}_duplicate_pair")
+    before=st.session_state.get(f"{title}_duplicate_shown")
+    st.session_state[f"{title}_duplicate_shown"]=pair
+    a,b=map(int,pair.split(":"))
+    perf.dataframe(df.loc[[a,b]])
+
+    def ready():
+        if before!=pair:
+            st.error("The suggestions changed; check the pair above and try again")
+            return False
+        current=portal.store.read(name).index
+        if a not in current or b not in current:
+            st.error("One of these rows was already merged or deleted")
+            return False
+        return True
+
+    c1,c2,c3=st.columns(3)
+    if c1.button("Keep first",key=f"{title}_keep_first") and ready():
+        dedupe.merge(portal.stats,df,name,a,b)
+        st.success("Merged into the first row")
+    if c2.button("Keep second",key=f"{title}_keep_second") and ready():
+        dedupe.merge(portal.stats,df,name,b,a)
+        st.success("Merged into the second row")
+    if c3.button("Not duplicates",key=f"{title}_not_duplicates") and ready():
+        engine.dismiss(name,a,b)
+        st.success("Will not be suggested again")
+
+
+def table_page(name,title):
+    def page(portal):
+        admin_controls(portal,load(portal.store,name),name,title)
+    return page
+
+
+families=table_page("families","Families")
+team=table_page("team","Village Team")
+places=table_page("places","Village Places")
+leagues=table_page("leagues","Village Leagues")
+# ✅ NEW YOUTH ADMIN SECTION
+youth=table_page("youth","Youth Association")
+
+
+def pupils(portal):
+    store=portal.store
+    df=load(store,"pupils")
+    with perf.stage("detect_ward"):
+        wards=store.derived("ward_ranges","wards",WardIndex).assign(df["Voter_ID"])
+    admin_controls(portal,df,"pupils","Pupils",view=df.assign(Ward=wards))
@@ -0,0 +1,52 @@
+import streamlit as st
+
+import perf
+from paging import paged_table
+from views import load
+from wards import WardIndex
+
+
+# ====================================================
+# WARD SETTINGS
+# ====================================================
+def render(portal):
+    store,stats=portal.store,portal.stats
+    ward_index=store.derived("ward_ranges","wards",WardIndex)
+
+    st.header("Ward Range Management")
+    paged_table(load(store,"ward_ranges"),"ward_ranges")
+
+    for pos in ward_index.invalid:
+        st.warning(f"Row {pos} ignored: Ward, Start and End must be whole numbers with Start <= End")
+    for (w,s,e),(kw,ks,ke) in ward_index.overlaps:
+        st.warning(f"Ward {w} ({s}-{e}) overlaps Ward {kw} ({ks}-{ke}) and is not used")
+
+    # the older wards.csv assignments, where they still exist
+    if (portal.base_dir/"wards.csv").exists():
+        legacy=store.derived("wards","wards",WardIndex)
+        differ=ward_index.compare(legacy)
+        if len(differ):
+            st.warning(f"{len(differ)} voter ranges are assigned differently in wards.csv")
+            with st.expander("Ranges that disagree with wards.csv"):
+                perf.dataframe(differ.rename(columns={"Ward":"ward_ranges","Other":"wards.csv"}))
+
+    st.subheader("Ward-wise Members")
+    pupils=load(store,"pupils")
+    with perf.stage("detect_ward"):
+        counts=ward_index.counts(pupils["Voter_ID"])
+    perf.dataframe(counts)
+
+    if st.session_state.role!="admin":
+        st.warning("Admin only")
+        st.stop()
+
+    ward=st.number_input("Ward Number",step=1)
+    start=st.number_input("Start Range",step=1)
+    end=st.number_input("End Range",step=1)
+
+    if st.button("Save Range"):
+        if start>end or ward_index.clashes(start,end):
+            st.error("Range is empty or overlaps an existing ward")
+            st.stop()
+        stats.add("ward_ranges",{"Ward":ward,"Start":start,"End":end})
+        st.success("Saved")
@@ -0,0 +1,120 @@
+import threading
+
+import folium
+import streamlit as st
+import streamlit.components.v1 as components
+from folium.plugins import FastMarkerCluster
+
+from geo import valid_points
+
+try:
+    from streamlit_folium import st_folium
+except ImportError:
+    st_folium=None
+
+
+# ---------------- VILLAGE MAP ----------------
+# With streamlit-folium installed the map is live: it reports its bounds
+# back, and only the markers inside the current view (geo.PointIndex.bbox,
+# at most MAX_MARKERS) are sent, as a layer on top of the fixed boundary.
+# That base map is built and rendered once per data version (live_map) and
+# shared; a rerun only builds the viewport layer.
+# Without it, the whole map is rendered to HTML once per data version and
+# every rerun just re-sends that string, markers clustered in the browser.
+
+CENTER=[18.678054,78.961130]
+ZOOM=15
+
+# village boundary outline (you can change coordinates)
+BOUNDARY=[
+    [18.6795,78.9590],
+    [18.6805,78.9620],
+    [18.6775,78.9640],
+    [18.6765,78.9605],
+]
+
+# one marker per point, popup text (never HTML) from the third column
+CLUSTER_MARKER="""
+function(row){
+    var marker=L.marker(new L.LatLng(row[0],row[1]));
+    var popup=document.createElement("div");
+    popup.textContent=row[2];
+    marker.bindPopup(popup);
+    return marker;
+}
+"""
+
+
+def base_map():
+    m=folium.Map(location=CENTER,zoom_start=ZOOM)
+
+    folium.Marker(CENTER,popup="SARVAPOOR KOTHAPALLE",icon=folium.Icon(color="red")).add_to(m)
+    folium.Polygon(
+        locations=BOUNDARY,
+        color="blue",
+        fill=True,
+        fill_opacity=0.2,
+        popup="Sarvapoor Kothapalle Boundary"
+    ).add_to(m)
+    return m
+
+
+def build_map(places):
+    m=base_map()
+    points=valid_points(places)
+    if len(points):
+        FastMarkerCluster(points.values.tolist(),callback=CLUSTER_MARKER).add_to(m)
+    return m
+
+
+def map_html(places):
+    return build_map(places).get_root().render()
+
+
+def show(html,height=500):
+    if hasattr(st,"iframe"):
+        st.iframe(html,height=height)
+    else:
+        components.html(html,height=height)
+
+
+# ---------------- LIVE VIEWPORT ----------------
+MAX_MARKERS=300
+# south, west, north, east: about what the map shows around CENTER at ZOOM
+DEFAULT_VIEW=(18.670,78.950,18.686,78.972)
+
+
+def view_bounds(value):
+    bounds=(value or {}).get("bounds") or {}
+    try:
+        sw,ne=bounds["_southWest"],bounds["_northEast"]
+        return float(sw["lat"]),float(sw["lng"]),float(ne["lat"]),float(ne["lng"])
+    except (KeyError,TypeError,ValueError):
+        return DEFAULT_VIEW
+
+
+def markers(points):
+    group=folium.FeatureGroup(name="Places")
+    for p in points.itertuples(index=False):
+        label=f"{p.Name} ({p.Category})" if p.Category else p.Name
+        folium.Marker([p.Latitude,p.Longitude],popup=folium.Popup(label,parse_html=True)).add_to(group)
+    return group
+
+
+_live_lock=threading.Lock()   # st_folium attaches the layer to the shared map
+
+
+def live_map(places=None):
+    m=base_map()
+    m.get_root().render()
+    return m
+
+
+def show_viewport(index,base,key="village_map",height=500):
+    view=view_bounds(st.session_state.get(key))
+    shown=index.bbox(*view,limit=MAX_MARKERS)
+    layer=markers(shown)
+    with _live_lock:
+        st_folium(base,key=key,height=height,use_container_width=True,render=False,
+                  returned_objects=["bounds"],feature_group_to_add=layer)
+    return shown
@@ -0,0 +1,277 @@
+import functools
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from schema import typed
+from wards import WardIndex
+
+
+# ---------------- VILLAGE STATISTICS ----------------
+# Dashboard aggregates (population and voters per ward, age pyramid,
+# household sizes, league wins) computed once per data version and saved to
+# village_stats.json with the versions they describe. Admin writes go
+# through add/update/delete here, which write to the store and then adjust
+# the counts by the one row that changed (and the one or two households it
+# belongs to) instead of recomputing. Anything else (a hand-edited CSV, a
+# write from another app, a new ward range) leaves the saved versions
+# behind and the next read rebuilds.
+#
+# A household's ward is the most common ward among its voters (lowest ward
+# on a tie), "Unknown" when none of them resolves. Each household's member
+# count and voter wards are kept in memory alongside the counts (not in the
+# JSON), so a write adjusts its household without looking the family up.
+
+TABLES=("pupils","leagues","ward_ranges")
+UNKNOWN="Unknown"
+AGE_BANDS=list(range(0,90,10))
+BAND_LABELS=[f"{a}-{a+9}" for a in AGE_BANDS[:-1]]+[f"{AGE_BANDS[-1]}+"]
+
+
+def age_bands(ages):
+    ages=pd.to_numeric(pd.Series(ages),errors="coerce").to_numpy(dtype=float)
+    ok=~np.isnan(ages)&(ages>=0)
+    band=np.clip(np.where(ok,ages,0)//10,0,len(AGE_BANDS)-1).astype(int)
+    return pd.Series(np.where(ok,np.asarray(BAND_LABELS,dtype=object)[band],UNKNOWN))
+
+
+def age_band(age):
+    return age_bands([age]).iloc[0]
+
+
+def _labels(wards):
+    return wards.astype("string").fillna(UNKNOWN).astype(object)
+
+
+def _counts(series):
+    return {str(k):int(v) for k,v in series.value_counts().items()}
+
+
+def _bump(counts,key,by):
+    key=str(key)
+    counts[key]=counts.get(key,0)+by
+    if counts[key]<=0:
+        del counts[key]
+
+
+def household_ward(wards):
+    known=wards.dropna()
+    if known.empty:
+        return UNKNOWN
+    counts=known.value_counts()
+    return str(min(counts.index[counts==counts.max()]))
+
+
+class VillageStats:
+
+    def __init__(self,store,path):
+        self.store=store
+        self.path=Path(path)
+        self._lock=threading.RLock()
+        self.state=None
+        self.households=None   # (versions, {Family_ID: [members, {ward: voters}]})
+
+    def wards(self):
+        return self.store.derived("ward_ranges","wards",WardIndex)
+
+    def versions(self):
+        return json.loads(json.dumps({name:self.store.version(name) for name in TABLES}))
+
+    # ---------------- FULL BUILD ----------------
+    def build(self):
+        pupils=self.store.read("pupils")
+        leagues=self.store.read("leagues")
+        wards=self.wards().assign(pupils["Voter_ID"]) if "Voter_ID" in pupils else pd.Series(pd.NA,index=pupils.index,dtype="Int64")
+        ages=age_bands(pupils["Age"]) if "Age" in pupils else pd.Series(dtype=object)
+        voters=pupils["Voter_ID"].notna() if "Voter_ID" in pupils else pd.Series(False,index=pupils.index)
+
+        sizes=pd.Series(dtype="int64")
+        population={}
+        if "Family_ID" in pupils:
+            fid=pupils["Family_ID"].astype(object)
+            sizes=fid.value_counts()
+            pairs=pd.DataFrame({"fid":fid,"ward":wards}).dropna()
+            pairs=pairs.value_counts().rename("n").reset_index()
+            mode=pairs.sort_values(["n","ward"],ascending=[False,True]).drop_duplicates("fid").set_index("fid")["ward"]
+            family_ward=_labels(mode.reindex(sizes.index))
+            population={str(k):int(v) for k,v in sizes.groupby(family_ward.to_numpy()).sum().items() if v}
+
+        return {
+            "versions":self.versions(),
+            "population":population,
+            "voters":_counts(_labels(wards[voters])),
+            "ages":_counts(ages),
+            "household_sizes":_counts(sizes),
+            "league_wins":_counts(leagues["Winner"].dropna()) if "Winner" in leagues else {},
+        }
+
+    def _save(self):
+        tmp=self.path.with_name(self.path.name+".tmp")
+        tmp.write_text(json.dumps(self.state))
+        os.replace(tmp,self.path)
+
+    def current(self):
+        with self._lock:
+            versions=self.versions()
+            if self.state and self.state["versions"]==versions:
+                return self.state
+            try:
+                saved=json.loads(self.path.read_text())
+            except (OSError,ValueError):
+                saved=None
+            if saved and saved.get("versions")==versions:
+                self.state=saved
+            else:
+                self.state=self.build()
+                self._save()
+            return self.state
+
+    # ---------------- HOUSEHOLDS ----------------
+    def _families(self):
+        # in step with self.state; rebuilt in one pass when it is not
+        if self.households and self.households[0]==self.state["versions"]:
+            return self.households[1]
+        pupils=self.store.read("pupils")
+        families={}
+        if "Family_ID" in pupils:
+            fid=pupils["Family_ID"].astype(object)
+            families={f:[int(n),{}] for f,n in fid.value_counts().items()}
+            if "Voter_ID" in pupils:
+                pairs=pd.DataFrame({"fid":fid,"ward":self.wards().assign(pupils["Voter_ID"])}).dropna()
+                for (f,w),n in pairs.value_counts().items():
+                    families[f][1][int(w)]=int(n)
+        self.households=(self.state["versions"],families)
+        return families
+
+    def _member(self,families,row,sign):
+        fid=row.get("Family_ID")
+        if pd.isna(fid):
+            return
+        entry=families.setdefault(fid,[0,{}])
+        entry[0]+=sign
+        voter=row.get("Voter_ID")
+        ward=self.wards().resolve(voter) if pd.notna(voter) else UNKNOWN
+        if ward!=UNKNOWN:
+            entry[1][ward]=entry[1].get(ward,0)+sign
+            if entry[1][ward]<=0:
+                del entry[1][ward]
+        if entry[0]<=0:
+            del families[fid]
+
+    def _household(self,families,fid):
+        n,wards=families.get(fid,(0,{}))
+        if not wards:
+            return n,UNKNOWN
+        most=max(wards.values())
+        return n,str(min(w for w,c in wards.items() if c==most))
+
+    # ---------------- INCREMENTAL WRITES ----------------
+    def _row(self,name,key):
+        df=self.store.read(name)
+        return df.loc[key] if key in df.index else None
+
+    def _apply(self,s,name,row,sign):
+        if name=="leagues":
+            if row is not None and pd.notna(row.get("Winner")):
+                _bump(s["league_wins"],row["Winner"],sign)
+        elif name=="pupils" and row is not None:
+            _bump(s["ages"],age_band(row.get("Age")),sign)
+            voter=row.get("Voter_ID")
+            if pd.notna(voter):
+                _bump(s["voters"],self.wards().resolve(voter),sign)
+
+    def _write(self,name,old_key,new_row,write):
+        if name not in TABLES:
+            return write()
+        with self._lock:
+            self.current()
+            if name=="ward_ranges":
+                write()
+                self.state=None   # every ward may move: rebuild on next read
+                return
+
+            s=json.loads(json.dumps(self.state))   # readers keep the old dict
+            old=self._row(name,old_key) if old_key is not None else None
+            fids={r.get("Family_ID") for r in (old,new_row) if r is not None and name=="pupils"}
+            fids={f for f in fids if pd.notna(f)}
+            families=self._families() if name=="pupils" else None
+            before={f:self._household(families,f) for f in fids}
+
+            write()
+            if new_row is not None and old_key is not None:
+                new_row=self._row(name,old_key)   # as stored, typed
+
+            self._apply(s,name,old,-1)
+            self._apply(s,name,new_row,+1)
+            for row,sign in ((old,-1),(new_row,+1)):
+                if families is not None and row is not None:
+                    self._member(families,row,sign)
+            for f in fids:
+                (n0,w0),(n1,w1)=before[f],self._household(families,f)
+                if n0:
+                    _bump(s["household_sizes"],n0,-1)
+                    _bump(s["population"],w0,-n0)
+                if n1:
+                    _bump(s["household_sizes"],n1,+1)
+                    _bump(s["population"],w1,+n1)
+            s["versions"]=self.versions()
+            if families is None and self.households and self.households[0]==self.state["versions"]:
+                families=self.households[1]   # still in step: other tables don't move households
+            if families is not None:
+                self.households=(s["versions"],families)
+            self.state=s
+            self._save()
+
+    def add(self,name,row):
+        stored={c:None if v=="" else v for c,v in row.items()}   # as storage writes it
+        self._write(name,None,typed(pd.DataFrame([stored])).iloc[0],lambda:self.store.add(name,row))
+
+    def update(self,name,key,row):
+        self._write(name,key,pd.Series(row),lambda:self.store.update(name,key,row))
+
+    def delete(self,name,key):
+        self._write(name,key,None,lambda:self.store.delete(name,key))
+
+    def add_many(self,name,rows):
+        with self._lock:
+            self.store.add_many(name,rows)
+            if name in TABLES:
+                self.state=None   # a bulk import: rebuild on next read
+
+
+@functools.lru_cache(maxsize=None)
+def engine(store,base_dir):
+    return VillageStats(store,Path(base_dir)/"village_stats.json")
+
+
+# ---------------- DASHBOARD TABLES ----------------
+def _ward_order(key):
+    return (1,0) if key==UNKNOWN else (0,int(key))
+
+
+def ward_table(state):
+    wards=sorted(set(state["population"])|set(state["voters"]),key=_ward_order)
+    return pd.DataFrame({
+        "Ward":wards,
+        "Population":[state["population"].get(w,0) for w in wards],
+        "Voters":[state["voters"].get(w,0) for w in wards],
+    })
+
+
+def age_table(state):
+    bands=BAND_LABELS+[UNKNOWN]
+    return pd.DataFrame({"Age":bands,"Members":[state["ages"].get(b,0) for b in bands]}).query("Members>0")
+
+
+def household_table(state):
+    sizes=sorted(state["household_sizes"],key=int)
+    return pd.DataFrame({"Members":[int(s) for s in sizes],"Households":[state["household_sizes"][s] for s in sizes]})
+
+
+def league_table(state):
+    wins=sorted(state["league_wins"].items(),key=lambda kv:(-kv[1],kv[0]))
+    return pd.DataFrame(wins,columns=["Winner","Wins"])
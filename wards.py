@@ -0,0 +1,114 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------- VOTER NUMBERS ----------------
+# Voter ids arrive as floats ("222.0" once pandas sees a blank cell) or as
+# text like "ABC991"; the ward number is the digits, ignoring a float tail.
+
+def voter_number(voter_id):
+    if pd.isna(voter_id):
+        return None
+    if isinstance(voter_id,float) and voter_id.is_integer():
+        voter_id=int(voter_id)
+    number="".join(filter(str.isdigit,str(voter_id).removesuffix(".0")))
+    return int(number) if number else None
+
+
+def voter_numbers(series):
+    text=series.astype(object).where(series.notna(),"").astype(str)
+    digits=text.str.replace(r"\.0$","",regex=True).str.replace(r"\D","",regex=True)
+    return pd.to_numeric(digits.where(digits!=""),errors="coerce").to_numpy(dtype=float)
+
+
+# ---------------- WARD INTERVAL INDEX ----------------
+COMPARED=["Start","End","Ward","Other"]
+
+
+class WardIndex:
+
+    def __init__(self,ward_ranges):
+        self.invalid=[]
+        self.overlaps=[]
+
+        ranges=[]
+        for pos,row in enumerate(ward_ranges.itertuples(index=False)):
+            try:
+                ward,start,end=int(row.Ward),int(row.Start),int(row.End)
+            except (TypeError,ValueError):
+                self.invalid.append(pos)
+                continue
+            if start>end:
+                self.invalid.append(pos)
+                continue
+            ranges.append((start,end,ward))
+
+        # sorted, non-overlapping: a range that clashes with one already
+        # kept is reported, never matched
+        kept=[]
+        for start,end,ward in sorted(ranges):
+            if kept and start<=kept[-1][1]:
+                self.overlaps.append(((ward,start,end),(kept[-1][2],kept[-1][0],kept[-1][1])))
+                continue
+            kept.append((start,end,ward))
+
+        self.starts=[r[0] for r in kept]
+        self.ends=[r[1] for r in kept]
+        self.wards=[r[2] for r in kept]
+        self.arrays=np.array(self.starts),np.array(self.ends),np.array(self.wards)
+
+    def __len__(self):
+        return len(self.wards)
+
+    def clashes(self,start,end):
+        i=bisect.bisect_right(self.starts,end)-1
+        return i>=0 and self.ends[i]>=start
+
+    def resolve(self,voter_id):
+        number=voter_number(voter_id)
+        if number is None:
+            return "Unknown"
+        i=bisect.bisect_right(self.starts,number)-1
+        if i>=0 and number<=self.ends[i]:
+            return self.wards[i]
+        return "Unknown"
+
+    def assign(self,voter_ids):
+        numbers=voter_numbers(voter_ids)
+        if not self.wards:
+            return pd.Series(pd.NA,index=voter_ids.index,dtype="Int64")
+
+        starts,ends,wards=self.arrays
+        i=np.searchsorted(starts,numbers,side="right")-1
+        safe=i.clip(0)
+        hit=(i>=0)&(numbers<=ends[safe])
+        return pd.Series(pd.array(np.where(hit,wards[safe],0),dtype="Int64"),index=voter_ids.index).where(hit)
+
+    # ---------------- CROSS-CHECK ----------------
+    def compare(self,other):
+        # voter number ranges where two range tables (ward_ranges.csv and
+        # the older wards.csv) disagree: different wards, or only one of
+        # them covers the numbers. Ward is this index's, Other the other's.
+        edges=sorted({*self.starts,*other.starts,*(e+1 for e in self.ends),*(e+1 for e in other.ends)})
+        if len(edges)<2:
+            return pd.DataFrame(columns=COMPARED)
+        starts=pd.Series(edges[:-1])
+        seg=pd.DataFrame({
+            "Start":starts,
+            "End":pd.Series(edges[1:])-1,
+            "Ward":self.assign(starts).astype("string").fillna("none"),
+            "Other":other.assign(starts).astype("string").fillna("none"),
+        })
+        seg=seg[seg["Ward"]!=seg["Other"]]
+        # neighbouring pieces with the same disagreement become one range
+        new=(seg["Start"]!=seg["End"].shift()+1)|(seg["Ward"]!=seg["Ward"].shift())|(seg["Other"]!=seg["Other"].shift())
+        return seg.groupby(new.to_numpy(dtype=bool).cumsum()).agg(
+            Start=("Start","first"),End=("End","last"),Ward=("Ward","first"),Other=("Other","first")).reset_index(drop=True)
+
+    def counts(self,voter_ids):
+        wards=self.assign(voter_ids)
+        counts=wards.value_counts(dropna=False).sort_index()
+        counts.index=counts.index.astype("string").fillna("Unknown")
+        return counts.rename_axis("Ward").reset_index(name="Members")